@@ -1,5 +1,10 @@
+import os
+import sys
 from pymongo import MongoClient
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury import timeseries
+
 # Script made to erase AM (Axie Material) transactions from the db. Can cause trouble in the fee type definition algo.
 client = MongoClient('mongodb://localhost:27017/')
 
@@ -12,5 +17,7 @@ query = {
 }
 
 result = collection.delete_many(query)
+if timeseries.ENABLED:
+    timeseries.timeseries_collection(collection).delete_many({'meta.' + k: v for k, v in query.items()})
 
 print(f"Documents deleted: {result.deleted_count}")
@@ -1,23 +1,19 @@
+import os
+import sys
 from pymongo import MongoClient
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury.std_values import set_std_values
+
 # This script will attribute human-readable values to the documents.
+# The scan already stores std_value, so this only repairs documents that are missing it.
+# The conversion runs server-side with each token's decimals (see treasury/std_values.py).
 
 client = MongoClient('mongodb://localhost:27017/')
 
 db = client['treasury']
 collection = db['recent_data']
 
-n = 0
-for document in collection.find():
-    value = document.get('value')
-    n += 1
-    print(n)
-
-    std_value = float(value) / (10 ** 18)
-
-    collection.update_one(
-        {'_id': document['_id']},
-        {'$set': {'std_value': std_value}}
-    )
+n = set_std_values(collection)
 
-print("Conversion complete. Documents updated.")
+print(f"Conversion complete. {n} documents updated.")
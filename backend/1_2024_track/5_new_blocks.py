@@ -1,20 +1,36 @@
+import os
+import sys
 from pymongo import MongoClient
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury.store import ensure_transfer_index, upsert_transfers
+from treasury import timeseries
+
 # Connect to MongoDB
 client = MongoClient("mongodb://localhost:27017/")
 db = client["treasury"]
 
 recent_data_collection = db["recent_data"]
 new_txn_collection = db["new_txn"]
+address = "0x245db945c485b68fdc429e4f7085a1761aa4d45d"  # Treasury scanned into recent_data
+
+# Copy documents from "recent_data" to "new_txn", transfers already in "new_txn" are skipped
+ensure_transfer_index(new_txn_collection)
 
-# Copy documents from "recent_data" to "new_txn"
-documents = list(recent_data_collection.find({}))
-if documents:
-    new_txn_collection.insert_many(documents)
+copied = 0
+batch = []
+for document in recent_data_collection.find({}):
+    batch.append(document)
+    if len(batch) == 1000:
+        copied += upsert_transfers(new_txn_collection, batch, address)
+        batch = []
+copied += upsert_transfers(new_txn_collection, batch, address)
 
 # Delete all documents from "recent_data"
 recent_data_collection.delete_many({})
+if timeseries.ENABLED:
+    timeseries.timeseries_collection(recent_data_collection).delete_many({})
 
-print("Documents copied and erased successfully.")
+print(f"{copied} documents copied and originals erased successfully.")
 
 client.close()
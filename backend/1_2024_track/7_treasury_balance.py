@@ -1,18 +1,26 @@
+import os
+import sys
 import requests
-import json
 from pymongo import MongoClient
-from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury.api_client import post_json
+from treasury.balances import store_balances, compact_history
+from treasury.std_values import register_decimals
 
 # MongoDB setup
 client = MongoClient('mongodb://localhost:27017/')
 db = client['treasury']
-collection = db['balance']
 api_key = 'YOUR_API_KEY'
 
+# Full balance summaries stored by earlier runs are slimmed once with "--compact"
+if "--compact" in sys.argv:
+    print(f"{compact_history(db)} balance snapshots compacted.")
+
 # API request
 url = "https://api-gateway.skymavis.com/skynet/ronin/tokens/balances/summary"
 
-payload = json.dumps({
+payload = {
     "includes": [
         "RON"
     ],
@@ -22,29 +30,25 @@ payload = json.dumps({
         "ERC721",
         "ERC1155"
     ]
-})
-headers = {
-    'Content-Type': 'application/json',
-    'Accept': 'application/json',
-    'X-API-KEY': api_key
 }
 
-response = requests.request("POST", url, headers=headers, data=payload)
-
-if response.status_code == 200:
-    response_data = response.json()
+try:
+    response_data = post_json(url, payload, api_key)
+except requests.RequestException as e:
+    response_data = None
+    print(f"Failed to fetch data: {e}")
 
+if response_data is not None:
     # Process balances to add "std_value" and timestamp fields
     if 'result' in response_data and 'items' in response_data['result']:
         for item in response_data['result']['items']:
             if 'balance' in item and 'decimals' in item:
                 item['std_value'] = float(item['balance']) / (10 ** item['decimals'])
 
-    # Add timestamp field
-    response_data['timestamp'] = datetime.now(timezone.utc)
+        # Keep the token decimals registry used by the transfer std values up to date
+        register_decimals(db, response_data['result']['items'])
 
-    # Insert processed response data into MongoDB
-    collection.insert_one(response_data)
-    print("Data inserted into MongoDB successfully.")
-else:
-    print(f"Failed to fetch data. Status code: {response.status_code}, Response: {response.text}")
+    # Store the rows that changed since the last run and the latest balance (see treasury/balances.py)
+    items = response_data.get('result', {}).get('items', [])
+    changed = store_balances(db, payload['ownerAddress'], items)
+    print(f"Balance stored, {changed} token balances changed.")
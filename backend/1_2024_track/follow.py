@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+from pymongo import MongoClient
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury.scanner import scan, latest_block
+from treasury.scan_state import load_state
+from treasury.indexes import ensure_indexes
+from treasury.balances import fetch_summary
+from treasury.std_values import register_decimals
+from treasury.rollup import daily_rollup
+
+# Long-running follow mode for the 2024 track.
+# Polls for blocks past the last ingested height, stores the new transfers straight into new_txn
+# with std values and fee types resolved inline, then re-aggregates the days they fall on.
+# Nothing before the last ingested block is processed again: without a follow scan state and
+# with an empty new_txn it exits instead of scanning the chain from the first block.
+
+client = MongoClient('mongodb://localhost:27017/')
+db = client['treasury']
+collection = db['new_txn']
+frontend_data = db['frontend_data']
+api_key = 'YOUR_API_KEY' # You need to ask SM an auth for your key to use this endpoint
+
+address = "0x245db945c485b68fdc429e4f7085a1761aa4d45d"
+
+poll_interval = 60  # Seconds between polls for new blocks
+confirmations = 20  # Blocks kept behind the chain head so only settled blocks are ingested
+block_step = 200
+max_workers = int(os.environ.get('SCAN_WORKERS', 8))
+
+
+def last_ingested_block():
+    state = load_state(collection, address)
+    if state:
+        return state['committed_block']
+    # First run: continue after the newest transfer already copied into new_txn
+    newest = collection.find_one({}, {'blockNumber': 1}, sort=[('blockNumber', -1)])
+    if not newest:
+        # SystemExit is not caught by the poll loop below
+        raise SystemExit("new_txn is empty and there is no follow scan state: run main.py to backfill "
+                         "the 2024 track first, follow mode only continues after the last ingested block.")
+    return newest['blockNumber']
+
+
+def ingest(first_block, last_block):
+    scan(collection, [address], first_block, last_block, api_key, block_step=block_step, max_workers=max_workers,
+         classify_fees=True)
+
+    # The scan marks the days of the new transfers dirty, only those are re-aggregated
+    updated_days = daily_rollup(collection, frontend_data)
+    print(f"Blocks {first_block} to {last_block} ingested, {updated_days} daily rows updated.")
+
+
+ensure_indexes(db)
+
+# Token decimals before the first scan, so std_value is right from the start (see treasury/std_values.py)
+try:
+    register_decimals(db, fetch_summary(address, api_key))
+except Exception as e:
+    print(f"Token decimals not refreshed: {e}")
+
+while True:
+    try:
+        first_block = last_ingested_block() + 1
+        last_block = latest_block() - confirmations
+        if last_block >= first_block:
+            ingest(first_block, last_block)
+        else:
+            print(f"No new blocks past {first_block - 1}.")
+    except Exception as e:
+        print(f"Follow iteration failed, retrying next poll: {e}")
+
+    time.sleep(poll_interval)
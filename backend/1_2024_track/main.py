@@ -1,6 +1,9 @@
 import subprocess
+import sys
 
 files = [
+    "../ensure_indexes.py",
+    "../register_decimals.py",
     "1_treasuryScan.py",
     "2_deleteAM.py",
     "3_stdValues.py",
@@ -8,6 +11,11 @@ files = [
     "5_frontendData.py",
 ]
 
+# "python main.py --follow" keeps ingesting new blocks instead of running a single batch
+if "--follow" in sys.argv:
+    subprocess.run(["python", "follow.py"])
+    sys.exit()
+
 while True:
     for file in files:
         subprocess.run(["python", file])
@@ -1,80 +1,25 @@
-import requests
-import json
+import os
+import sys
 from pymongo import MongoClient
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury.scanner import scan
+
 # This script will retrieve data from the old treasury
-# It takes a long time to retrieve all data
+# Block windows are fetched concurrently (see treasury/scanner.py), set SCAN_WORKERS to tune it
 
 client = MongoClient('mongodb://localhost:27017/')
 db = client['treasury']
 collection = db['old_treasury']
 api_key = 'YOUR_API_KEY'  # You need to ask SM an auth for your key to use this endpoint
 
-url = "https://api-gateway.skymavis.com/skynet-tx-query/ronin/tokens/transfers/search"
-
 addresses = [
     "0xa99cacd1427f493a95b585a5c7989a08c86a616b"
 ]
 
 start_block = 12309008 #First block transaction from 29th March 2022
 end_block = 24877124 #Last block transaction from the treasury
-block_step = 200
-
-total_requests = 0
-total_time = 0
-
-for address in addresses:
-    current_start_block = start_block
-
-    while current_start_block <= end_block:
-        current_end_block = min(current_start_block + block_step - 1, end_block)
-        print(f"Retrieving blocks {current_start_block} to {current_end_block} for address {address}...")
-
-        offset = 0
-        while True:
-            payload = json.dumps({
-                "address": {
-                    "relateTo": address,
-                },
-                "block": {
-                    "blockRange": [
-                        current_start_block,
-                        current_end_block
-                    ]
-                },
-                "paging": {
-                    "limit": 200,
-                    "offset": offset,
-                    "pagingStyle": "offset"
-                },
-            })
-
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json',
-                'X-API-KEY': api_key
-            }
-
-            response = requests.request("POST", url, headers=headers, data=payload)
-            total_requests += 1
-            response_json = response.json()
-
-            if 'result' in response_json and 'items' in response_json['result']:
-                items = response_json['result']['items']
-                if items:
-                    collection.insert_many(items)
-                    print(f"{len(items)} new documents processed.")
-                    if len(items) < 200:
-                        break
-                else:
-                    print("No new documents to process.")
-                    break
-            else:
-                print("Empty response or unexpected format.")
-                break
-
-            offset += 200
-        current_start_block += block_step
+block_step = 200  # Starting window size, the scanner resizes it from the transfer density it sees
+max_workers = int(os.environ.get('SCAN_WORKERS', 8))  # Number of block windows fetched at the same time
 
-print(f"All data fetched and stored in MongoDB.")
-print(f"Total requests made: {total_requests}")
+scan(collection, addresses, start_block, end_block, api_key, block_step=block_step, max_workers=max_workers)
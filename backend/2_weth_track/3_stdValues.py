@@ -1,40 +1,19 @@
+import os
+import sys
 from pymongo import MongoClient
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury.std_values import set_std_values
+
 # This script will attribute human-readable values to the documents
+# The scan already stores std_value, so this only repairs documents that are missing it
+# The conversion runs server-side with each token's decimals (see treasury/std_values.py)
 
 client = MongoClient('mongodb://localhost:27017/')
 
 db = client['treasury']
-new_collection = db['new_treasury']
-
-n = 0
-for document in new_collection.find():
-    value = document.get('value')
-    n += 1
-    print(f'New Treasury Document {n}')
-
-    std_value = float(value) / (10 ** 18)
-
-    new_collection.update_one(
-        {'_id': document['_id']},
-        {'$set': {'std_value': std_value}}
-    )
-
-print("New Treasury Standard Values Updated.")
-
-old_collection = db['old_treasury']
-
-m = 0
-for document in old_collection.find():
-    value = document.get('value')
-    m += 1
-    print(f'Old Treasury Document {m}')
-
-    std_value = float(value) / (10 ** 18)
-
-    old_collection.update_one(
-        {'_id': document['_id']},
-        {'$set': {'std_value': std_value}}
-    )
+n = set_std_values(db['new_treasury'])
+print(f"New Treasury Standard Values Updated: {n} documents.")
 
-print("Old Treasury Standard Values Updated.")
+m = set_std_values(db['old_treasury'])
+print(f"Old Treasury Standard Values Updated: {m} documents.")
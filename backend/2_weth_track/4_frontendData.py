@@ -1,5 +1,13 @@
+import os
+import sys
 from pymongo import MongoClient
-from bson import SON
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from treasury.rollup import daily_rollup
+
+# Daily sums of the WETH sent to both treasuries, stored as weth_marketplace in frontend_data.
+# Transfers of 50 WETH or more are left out. Only days marked dirty in new_treasury or
+# old_treasury are re-aggregated, "--full" rebuilds every day (see treasury/rollup.py).
 
 client = MongoClient("mongodb://localhost:27017/")
 db = client["treasury"]
@@ -12,79 +20,9 @@ wallets = {
     "old_treasury": "0xa99cacd1427f493a95b585a5c7989a08c86a616b"
 }
 
-def create_pipeline(token, wallet):
-    return [
-        {
-            "$match": {
-                "tokenSymbol": token,
-                "to": wallet,
-                "std_value": {"$lt": 50}
-            }
-        },
-        {
-            "$addFields": {
-                "blockTimeDate": {
-                    "$toDate": {"$multiply": ["$blockTime", 1000]}
-                }
-            }
-        },
-        {
-            "$group": {
-                "_id": {
-                    "day": {"$dayOfMonth": "$blockTimeDate"},
-                    "month": {"$month": "$blockTimeDate"},
-                    "year": {"$year": "$blockTimeDate"},
-                },
-                "daily_sum": {"$sum": "$std_value"}
-            }
-        },
-        {
-            "$project": {
-                "_id": 0,
-                "timestamp": {
-                    "$dateFromParts": {
-                        "day": "$_id.day",
-                        "month": "$_id.month",
-                        "year": "$_id.year",
-                    }
-                },
-                "weth_marketplace": "$daily_sum"
-            }
-        },
-        {
-            "$sort": SON([("timestamp", 1)])
-        }
-    ]
-
-def process_treasury(collection, wallet):
-    pipeline = create_pipeline("WETH", wallet)
-    result = collection.aggregate(pipeline)
-
-    final_results = {}
-
-    for doc in result:
-        timestamp = doc["timestamp"]
-        unix_timestamp = int(timestamp.timestamp())  # Convert to Unix timestamp
-        if timestamp not in final_results:
-            final_results[timestamp] = {
-                "timestamp": timestamp,
-                "date": unix_timestamp  # Add the new "date" field
-            }
-        final_results[timestamp]["weth_marketplace"] = doc["weth_marketplace"]
-
-    for doc in final_results.values():
-        timestamp = doc["timestamp"]
-        update_fields = {
-            "weth_marketplace": doc["weth_marketplace"],
-            "date": doc["date"]  # Include the new "date" field in the update
-        }
-        frontend_data.update_one(
-            {"timestamp": timestamp},
-            {"$set": update_fields},
-            upsert=True
-        )
-
-process_treasury(new_treasury, wallets["new_treasury"])
-process_treasury(old_treasury, wallets["old_treasury"])
+# Both treasuries in one aggregation; the running totals and weekly and monthly sums follow
+updated_days = daily_rollup(new_treasury, frontend_data, wallet=wallets["new_treasury"], tokens=["WETH"],
+                            union=[(old_treasury, wallets["old_treasury"])], max_value=50,
+                            inflow_field="marketplace", outflows=False, keep_fields=(), full="--full" in sys.argv)
 
-print("Aggregation and insertion completed.")
+print(f"Aggregation and insertion completed ({'full rebuild' if updated_days is None else f'{updated_days} days'}).")
@@ -1,13 +1,22 @@
 import subprocess
 
+# Both treasuries are backfilled by one sharded scan (see ../scan_treasuries.py)
+scan = [
+    "../scan_treasuries.py",
+    "0x245db945c485b68fdc429e4f7085a1761aa4d45d:new_treasury:17934197:30746337",
+    "0xa99cacd1427f493a95b585a5c7989a08c86a616b:old_treasury:12309008:24877124",
+]
+
 files = [
-    "1_newTreasury.py",
-    "2_oldTreasury.py",
     "3_stdValues.py",
     "4_frontendData.py",
 ]
 
 while True:
+    subprocess.run(["python", "../ensure_indexes.py"])
+    subprocess.run(["python", "../register_decimals.py"])
+    subprocess.run(["python"] + scan)
+
     for file in files:
         subprocess.run(["python", file])
 
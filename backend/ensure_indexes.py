@@ -0,0 +1,19 @@
+import os
+import sys
+
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from treasury.indexes import ensure_indexes, print_explain
+
+# Creates the indexes every pipeline relies on, then prints how the hot queries are executed.
+# Both track main.py scripts run it first; creating an index that already exists is a no-op.
+
+client = MongoClient('mongodb://localhost:27017/')
+db = client['treasury']
+
+ensure_indexes(db)
+print("Indexes are in place.")
+
+print_explain(db)
+client.close()
@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from treasury.archive import export_treasury
+
+# Exports the raw transfers to a Parquet dataset partitioned by treasury and month
+# (see treasury/archive.py). Only the newest exported month and the months after it are
+# written; --full rewrites everything, e.g. after a fee type reclassification.
+#
+# Usage: python export_parquet.py [--root archive] [--full]
+
+MONGO_URI = 'mongodb://localhost:27017/'
+DB_NAME = 'treasury'
+
+# Treasury address -> collections holding its transfers
+SOURCES = {
+    "0x245db945c485b68fdc429e4f7085a1761aa4d45d": ['new_treasury', 'new_txn'],
+    "0xa99cacd1427f493a95b585a5c7989a08c86a616b": ['old_treasury'],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export transfers to a partitioned Parquet archive")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive'))
+    parser.add_argument("--full", action="store_true", help="Rewrite every month")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+
+    for treasury, collection_names in SOURCES.items():
+        written = export_treasury(args.root, treasury, [db[name] for name in collection_names], args.full)
+        for month, rows in written.items():
+            print(f"{treasury} {month}: {rows} transfers written.")
+        print(f"{treasury}: {len(written)} partitions written.")
+
+    client.close()
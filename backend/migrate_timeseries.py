@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from treasury.timeseries import migrate
+
+# Copies the transfer collections into their time-series twins ("<name>_ts", see
+# treasury/timeseries.py). Each twin is rebuilt from scratch, so the script can be run again.
+# Run it before switching the pipelines to TRANSFER_STORAGE=timeseries; the regular
+# collections stay in place as the deduplication reference.
+# Every collection is given with the treasury address it was scanned for (meta.treasury).
+#
+# Usage: python migrate_timeseries.py [COLLECTION:ADDRESS ...]
+
+DEFAULT_TARGETS = [
+    "recent_data:0x245db945c485b68fdc429e4f7085a1761aa4d45d",
+    "new_txn:0x245db945c485b68fdc429e4f7085a1761aa4d45d",
+    "new_treasury:0x245db945c485b68fdc429e4f7085a1761aa4d45d",
+    "old_treasury:0xa99cacd1427f493a95b585a5c7989a08c86a616b",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Migrate transfer collections to time-series collections")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="COLLECTION:ADDRESS")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    client = MongoClient('mongodb://localhost:27017/')
+    db = client['treasury']
+
+    for target in args.targets:
+        collection_name, address = target.split(':')
+        copied = migrate(db[collection_name], address, args.batch_size)
+        print(f"{collection_name}: {copied} transfers copied to {collection_name}_ts.")
+
+    client.close()
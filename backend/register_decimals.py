@@ -0,0 +1,31 @@
+import os
+import sys
+
+import requests
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from treasury.balances import fetch_summary
+from treasury.std_values import register_decimals
+
+# Fills the token decimals registry from the balance summaries of the treasuries, so the
+# scans convert std_value with the right decimals from the first transfer on (see
+# treasury/std_values.py). Both track main.py scripts run it before scanning.
+
+client = MongoClient('mongodb://localhost:27017/')
+db = client['treasury']
+api_key = 'YOUR_API_KEY'  # You need to ask SM an auth for your key to use this endpoint
+
+owners = [
+    "0x245db945c485b68fdc429e4f7085a1761aa4d45d",  # New treasury
+    "0xa99cacd1427f493a95b585a5c7989a08c86a616b",  # Old treasury
+]
+
+for owner in owners:
+    try:
+        n = register_decimals(db, fetch_summary(owner, api_key))
+        print(f"{n} token decimals registered for {owner}.")
+    except requests.RequestException as e:
+        print(f"Failed to fetch the balance summary of {owner}: {e}")
+
+client.close()
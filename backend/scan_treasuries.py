@@ -0,0 +1,113 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# One scan entry point for any number of treasury addresses and block ranges.
+# Every target is split into block-range shards that run across a process pool, each
+# shard writing to its target collection with its own resumable scan_state entry.
+# The API rate limit is divided between the processes so together they stay in quota.
+#
+# Usage: python scan_treasuries.py ADDRESS:COLLECTION:START_BLOCK:END_BLOCK [...]
+# Without targets it backfills the new and old treasuries, like the WETH track scripts.
+
+MONGO_URI = 'mongodb://localhost:27017/'
+DB_NAME = 'treasury'
+API_KEY = 'YOUR_API_KEY'  # You need to ask SM an auth for your key to use this endpoint
+
+DEFAULT_TARGETS = [
+    "0x245db945c485b68fdc429e4f7085a1761aa4d45d:new_treasury:17934197:30746337",
+    "0xa99cacd1427f493a95b585a5c7989a08c86a616b:old_treasury:12309008:24877124",
+]
+
+worker_db = None
+
+
+def parse_target(target):
+    address, collection_name, start_block, end_block = target.split(':')
+    return address.lower(), collection_name, int(start_block), int(end_block)
+
+
+def make_shards(targets, shard_blocks):
+    shards = []
+    for address, collection_name, start_block, end_block in targets:
+        for first_block in range(start_block, end_block + 1, shard_blocks):
+            last_block = min(first_block + shard_blocks - 1, end_block)
+            shards.append((address, collection_name, first_block, last_block))
+    # Largest shards first so the pool does not end waiting on one long tail
+    return sorted(shards, key=lambda shard: shard[2] - shard[3])
+
+
+def init_worker(rate_limit):
+    global worker_db
+    from treasury.api_client import set_rate_limit
+    set_rate_limit(rate_limit)
+    worker_db = MongoClient(MONGO_URI)[DB_NAME]
+
+
+def run_shard(address, collection_name, first_block, last_block, block_step, threads, classify_fees):
+    from treasury.scanner import scan_address
+    collection = worker_db[collection_name]
+    return scan_address(collection, address, first_block, last_block, API_KEY, block_step=block_step,
+                        max_workers=threads, shard=first_block, classify_fees=classify_fees)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sharded multi-address treasury scan")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS,
+                        help="ADDRESS:COLLECTION:START_BLOCK:END_BLOCK")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--threads", type=int, default=int(os.environ.get('SCAN_WORKERS', 8)),
+                        help="Block windows in flight per process")
+    parser.add_argument("--shard-blocks", type=int, default=500000)
+    parser.add_argument("--block-step", type=int, default=200)
+    parser.add_argument("--classify-fees", action="store_true", help="Resolve feeType while ingesting")
+    parser.add_argument("--rate-limit", type=float, default=float(os.environ.get('SKYNET_RATE_LIMIT', 10)),
+                        help="Requests per second allowed for the API key, shared by all processes")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    from treasury.store import ensure_transfer_index
+
+    args = parse_args()
+    targets = [parse_target(target) for target in args.targets]
+    shards = make_shards(targets, args.shard_blocks)
+
+    db = MongoClient(MONGO_URI)[DB_NAME]
+    for collection_name in {target[1] for target in targets}:
+        ensure_transfer_index(db[collection_name])
+
+    processes = max(1, min(args.processes, len(shards)))
+    print(f"Scanning {len(targets)} targets in {len(shards)} shards on {processes} processes.")
+
+    total_requests = 0
+    total_documents = 0
+    total_baseline = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes, mp_context=get_context('spawn'),
+                             initializer=init_worker, initargs=(args.rate_limit / processes,)) as executor:
+        futures = {
+            executor.submit(run_shard, address, collection_name, first_block, last_block,
+                            args.block_step, args.threads, args.classify_fees): (address, collection_name, first_block, last_block)
+            for address, collection_name, first_block, last_block in shards
+        }
+        for future in as_completed(futures):
+            address, collection_name, first_block, last_block = futures[future]
+            requests_made, documents, baseline = future.result()
+            total_requests += requests_made
+            total_documents += documents
+            total_baseline += baseline
+            print(f"Shard {collection_name} {address} {first_block}-{last_block} done: "
+                  f"{documents} new documents, {requests_made} requests.")
+
+    elapsed = time.perf_counter() - started
+    print(f"All shards fetched and stored in MongoDB in {elapsed:.0f}s.")
+    print(f"Total new documents stored: {total_documents}")
+    print(f"Total requests made: {total_requests} (fixed-step estimate {total_baseline})")
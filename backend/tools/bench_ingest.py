@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fake_skynet import TREASURY, REFERENCE_BLOCK, FakeChain, start_server
+
+# Measures end-to-end docs/sec of 1_treasuryScan.py-style ingestion (the shared scanner
+# resolving fee types inline and writing to MongoDB) against the local fake Skynet server.
+# Needs a running MongoDB; the benchmark collection is dropped before each run.
+# The stored documents are checked against the transfers the fake chain holds, a run that
+# lost transfers exits with status 1.
+#
+# Usage: python tools/bench_ingest.py --blocks 20000 --density 0.5 --workers 8 --latency 80
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark transfer ingestion against the fake Skynet API")
+    parser.add_argument("--mongo", default="mongodb://localhost:27017/")
+    parser.add_argument("--db", default="treasury_bench")
+    parser.add_argument("--start-block", type=int, default=REFERENCE_BLOCK)
+    parser.add_argument("--blocks", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--block-step", type=int, default=200)
+    parser.add_argument("--fixed-step", action="store_true", help="Disable adaptive window sizing")
+    parser.add_argument("--paging", choices=["cursor", "offset"], default="cursor")
+    parser.add_argument("--client-rate", type=float, default=1000, help="Client side requests per second")
+    parser.add_argument("--url", help="Use an already running fake server instead of starting one")
+    parser.add_argument("--no-classify", action="store_true", help="Skip the inline fee type classification")
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=50)
+    parser.add_argument("--jitter", type=float, default=10)
+    parser.add_argument("--page-limit", type=int, default=200)
+    parser.add_argument("--rate-limit", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--no-cursor", action="store_true", help="Fake server rejects cursor paging")
+    parser.add_argument("--offset-penalty", type=float, default=0)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+server = None
+if args.url:
+    base_url = args.url
+else:
+    server = start_server(density=args.density, latency=args.latency, jitter=args.jitter,
+                          page_limit=args.page_limit, rate_limit=args.rate_limit, error_rate=args.error_rate,
+                          cursor_paging=not args.no_cursor, offset_penalty=args.offset_penalty)
+    base_url = server.base_url
+
+# The client reads these when it is imported
+os.environ['SKYNET_BASE_URL'] = base_url
+os.environ['SKYNET_RATE_LIMIT'] = str(args.client_rate)
+from treasury.scanner import scan
+
+client = MongoClient(args.mongo)
+db = client[args.db]
+collection = db['bench_transfers']
+collection.drop()
+db['scan_state'].delete_many({'collection': collection.name})
+
+end_block = args.start_block + args.blocks - 1
+started = time.perf_counter()
+total_requests = scan(collection, [TREASURY], args.start_block, end_block, 'BENCH',
+                      block_step=args.block_step, max_workers=args.workers, adaptive=not args.fixed_step,
+                      paging_style=args.paging, classify_fees=not args.no_classify)
+elapsed = time.perf_counter() - started
+
+documents = collection.count_documents({})
+expected = len(FakeChain(args.density).search(TREASURY, args.start_block, end_block))
+print(f"Blocks: {args.blocks}, workers: {args.workers}, adaptive: {not args.fixed_step}, paging: {args.paging}, "
+      f"fee types: {not args.no_classify}")
+print(f"Documents: {documents} in {elapsed:.2f}s -> {documents / elapsed:,.0f} docs/sec")
+print(f"Requests: {total_requests} -> {total_requests / elapsed:,.1f} requests/sec")
+if server:
+    print(f"Server counters: {server.counters}")
+    server.shutdown()
+if documents != expected:
+    print(f"Stored {documents} documents but the fake chain holds {expected} transfers in the range.")
+    sys.exit(1)
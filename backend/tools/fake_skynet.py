@@ -0,0 +1,326 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the two Skynet endpoints the scanners use, so ingestion can be
+# benchmarked and tuned without an API key or quota:
+#   POST /skynet-tx-query/ronin/tokens/transfers/search  (blockRange + offset or cursor paging)
+#   POST /skynet/ronin/tokens/transfers/txs              (full transfer list per transaction)
+# Transfers are synthetic but deterministic: the same block always holds the same
+# transactions, shaped like the real treasury fee flows so fee type classification works.
+#
+# Usage: python tools/fake_skynet.py --port 8099 --density 0.5 --latency 80 --rate-limit 20
+# then run any scan with SKYNET_BASE_URL=http://127.0.0.1:8099
+
+TREASURY = "0x245db945c485b68fdc429e4f7085a1761aa4d45d"
+ZERO = "0x0000000000000000000000000000000000000000"
+MARKETPLACE = "0xfff9ce5f71ca6178d3beecedb61e7eff1602950e"
+RC_MINTER = "0x36b628e771b0ca12a135e0a7b8e0394f99dce95b"
+PARTS_CONTRACT = "0x12b707c3d2786570cfdc3a998a085b62acdba4b3"
+
+TOKENS = {
+    "AXS": ("0x97a9107c1793bc407d6f527b77e7fff4d812bece", "Axie Infinity Shard", 18),
+    "WETH": ("0xc99a6a985ed2cac1ef41640596c5a5f9f4e19ef5", "Ronin Wrapped Ether", 18),
+    "SLP": ("0xa8754b9fa15fc18bb59458815510e40a12cd2014", "Smooth Love Potion", 0),
+}
+
+# Share of generated transactions per fee flow
+FEE_MIX = [
+    ("marketplace", 0.55),
+    ("breeding", 0.2),
+    ("ascending", 0.1),
+    ("partsEvol", 0.1),
+    ("r&cMint", 0.05),
+]
+
+REFERENCE_BLOCK = 30746338  # First block of 2024
+REFERENCE_TIME = 1704067200
+BLOCK_SECONDS = 3
+
+SEARCH_PATH = "/skynet-tx-query/ronin/tokens/transfers/search"
+TXS_PATH = "/skynet/ronin/tokens/transfers/txs"
+
+MASK = (1 << 64) - 1
+
+
+def mix(*values):
+    # splitmix64 over the inputs, cheap deterministic randomness per block and transaction
+    x = 0
+    for value in values:
+        x = (x + value + 0x9E3779B97F4A7C15) & MASK
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK
+        x ^= x >> 31
+    return x
+
+
+def unit(*values):
+    return mix(*values) / 2 ** 64
+
+
+def address_for(*values):
+    return "0x" + f"{mix(*values):016x}" * 2 + f"{mix(*values, 1):08x}"
+
+
+def transaction_hash(block, index, seed):
+    return "0x" + f"{block:012x}{index:04x}" + "".join(f"{mix(seed, block, index, part):016x}" for part in range(3))
+
+
+def decode_hash(tx_hash):
+    digits = tx_hash[2:] if tx_hash.startswith("0x") else tx_hash
+    return int(digits[:12], 16), int(digits[12:16], 16)
+
+
+def token_transfer(symbol, sender, receiver, amount):
+    contract, name, decimals = TOKENS[symbol]
+    return {
+        "from": sender,
+        "to": receiver,
+        "contractAddress": contract,
+        "tokenStandard": "ERC20",
+        "tokenSymbol": symbol,
+        "tokenName": name,
+        "value": str(int(amount * 10 ** decimals)),
+    }
+
+
+class FakeChain:
+    def __init__(self, density=0.5, seed=7, treasury=TREASURY):
+        self.density = density
+        self.seed = seed
+        self.treasury = treasury
+
+    def transaction_count(self, block):
+        whole = int(self.density)
+        return whole + (1 if unit(self.seed, block) < self.density - whole else 0)
+
+    def transaction(self, block, index):
+        # All transfers of one transaction, the first one always involves the treasury
+        u = unit(self.seed, block, index, 1)
+        user = address_for(self.seed, block, index, 2)
+        other = address_for(self.seed, block, index, 3)
+        amount = 0.05 + unit(self.seed, block, index, 4) * 20
+
+        cumulative = 0
+        fee_type = FEE_MIX[-1][0]
+        for name, share in FEE_MIX:
+            cumulative += share
+            if u < cumulative:
+                fee_type = name
+                break
+
+        if fee_type == "marketplace":
+            price = amount / 50
+            transfers = [
+                token_transfer("WETH", MARKETPLACE, self.treasury, price * 0.0425),
+                token_transfer("WETH", user, other, price),
+            ]
+        elif fee_type == "breeding":
+            transfers = [
+                token_transfer("AXS", user, self.treasury, amount / 10),
+                token_transfer("SLP", user, ZERO, int(amount * 100)),
+            ]
+        elif fee_type == "ascending":
+            transfers = [token_transfer("AXS", user, self.treasury, amount)]
+        elif fee_type == "partsEvol":
+            transfers = [
+                token_transfer("AXS", user, self.treasury, amount / 4),
+                {**token_transfer("AXS", user, ZERO, 0), "contractAddress": PARTS_CONTRACT,
+                 "tokenSymbol": "AM", "tokenName": "Axie Materials"},
+            ]
+        else:
+            transfers = [
+                token_transfer("AXS", RC_MINTER, self.treasury, amount),
+                token_transfer("AXS", user, RC_MINTER, amount),
+            ]
+
+        tx_hash = transaction_hash(block, index, self.seed)
+        for position, transfer in enumerate(transfers):
+            transfer.update({
+                "blockNumber": block,
+                "blockHash": "0x" + f"{mix(self.seed, block):016x}" * 4,
+                "blockTime": REFERENCE_TIME + (block - REFERENCE_BLOCK) * BLOCK_SECONDS,
+                "transactionHash": tx_hash,
+                "logIndex": index * 4 + position,
+            })
+        return transfers
+
+    def search(self, address, first_block, last_block, after=None, limit=None):
+        # Treasury transfers in the block range, optionally only those after a (block, logIndex) key
+        if address.lower() != self.treasury:
+            return []
+        items = []
+        if after is not None:
+            first_block = max(first_block, after[0])
+        for block in range(first_block, last_block + 1):
+            for index in range(self.transaction_count(block)):
+                item = self.transaction(block, index)[0]
+                if after is not None and (block, item["logIndex"]) <= after:
+                    continue
+                items.append(item)
+                if limit is not None and len(items) == limit:
+                    return items
+        return items
+
+    def txs(self, hashes):
+        items = []
+        for tx_hash in hashes:
+            block, index = decode_hash(tx_hash)
+            if index < self.transaction_count(block):
+                items.extend(self.transaction(block, index))
+        return items
+
+
+class Limiter:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server.count("requests")
+
+        latency = server.latency + random.uniform(-server.jitter, server.jitter)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+        if not server.limiter.allow():
+            server.count("rate_limited")
+            return self.send_json(429, {"error": "rate limit exceeded"}, {"Retry-After": "1"})
+        if random.random() < server.error_rate:
+            server.count("errors")
+            return self.send_json(503, {"error": "service unavailable"})
+
+        if self.path == SEARCH_PATH:
+            return self.search(body)
+        if self.path == TXS_PATH:
+            return self.send_json(200, {"result": {"items": server.chain.txs(body.get("transaction_hashes", []))}})
+        return self.send_json(404, {"error": f"unknown endpoint {self.path}"})
+
+    def search(self, body):
+        server = self.server
+        address = body.get("address", {}).get("relateTo", "")
+        first_block, last_block = body.get("block", {}).get("blockRange", [0, -1])
+        paging = body.get("paging", {})
+        limit = min(int(paging.get("limit", server.page_limit)), server.page_limit)
+
+        style = paging.get("pagingStyle", "offset")
+        if style == "cursor" and server.cursor_paging:
+            cursor = paging.get("cursor")
+            after = tuple(int(part) for part in cursor.split(":")) if cursor else None
+            # Fetch one extra item to know whether another page exists
+            items = server.chain.search(address, first_block, last_block, after, limit + 1)
+            page = items[:limit]
+            next_cursor = f"{page[-1]['blockNumber']}:{page[-1]['logIndex']}" if len(items) > limit else None
+            server.count("items", len(page))
+            return self.send_json(200, {"result": {"items": page, "paging": {"nextCursor": next_cursor}}})
+        if style != "offset":
+            return self.send_json(400, {"error": "unsupported pagingStyle"})
+
+        offset = int(paging.get("offset", 0))
+        # Deep offsets get slower, like a database skipping rows
+        if server.offset_penalty:
+            time.sleep(offset / limit * server.offset_penalty / 1000)
+        items = server.chain.search(address, first_block, last_block)
+        server.count("items", len(items[offset:offset + limit]))
+        return self.send_json(200, {"result": {"items": items[offset:offset + limit]}})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSkynetServer(ThreadingHTTPServer):
+    def __init__(self, address, chain, latency=0, jitter=0, page_limit=200, rate_limit=0, error_rate=0,
+                 cursor_paging=True, offset_penalty=0):
+        super().__init__(address, Handler)
+        self.chain = chain
+        self.cursor_paging = cursor_paging
+        self.offset_penalty = offset_penalty
+        self.latency = latency
+        self.jitter = jitter
+        self.page_limit = page_limit
+        self.limiter = Limiter(rate_limit)
+        self.error_rate = error_rate
+        self.counters = {"requests": 0, "rate_limited": 0, "errors": 0, "items": 0}
+        self.counters_lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        with self.counters_lock:
+            self.counters[name] += amount
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(host="127.0.0.1", port=0, density=0.5, seed=7, **options):
+    # Starts the fake server on a background thread and returns it
+    server = FakeSkynetServer((host, port), FakeChain(density, seed), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Skynet transfers API for local load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--density", type=float, default=0.5, help="Treasury transactions per block")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency", type=float, default=0, help="Added latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Random +/- latency in ms")
+    parser.add_argument("--page-limit", type=int, default=200, help="Largest page the server returns")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests per second before 429s, 0 disables")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of requests answered with 503")
+    parser.add_argument("--no-cursor", action="store_true", help="Reject cursor paging with a 400")
+    parser.add_argument("--offset-penalty", type=float, default=0, help="Extra ms per page skipped by an offset")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = FakeSkynetServer(
+        (args.host, args.port), FakeChain(args.density, args.seed),
+        latency=args.latency, jitter=args.jitter, page_limit=args.page_limit,
+        rate_limit=args.rate_limit, error_rate=args.error_rate,
+        cursor_paging=not args.no_cursor, offset_penalty=args.offset_penalty
+    )
+    print(f"Fake Skynet API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Served: {server.counters}")
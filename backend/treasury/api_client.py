@@ -0,0 +1,136 @@
+import os
+import json
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP client for the Sky Mavis, Ronin RPC and CoinGecko calls.
+# One pooled keep-alive session, a token-bucket rate limiter per host, retries with
+# exponential backoff and jitter on 429/5xx/connection errors, and per-endpoint counters.
+# Set SKYNET_RATE_LIMIT to the requests per second allowed for your API key, and
+# SKYNET_BASE_URL to point the Skynet calls somewhere else (e.g. tools/fake_skynet.py).
+
+SKYNET_BASE_URL = os.environ.get('SKYNET_BASE_URL', "https://api-gateway.skymavis.com").rstrip('/')
+
+RATE_LIMITS = {
+    urlparse(SKYNET_BASE_URL).netloc: float(os.environ.get('SKYNET_RATE_LIMIT', 10)),
+    "api.coingecko.com": 0.5,  # Public CoinGecko tier, about 30 calls per minute
+}
+
+POOL_SIZE = 32
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5  # Seconds
+BACKOFF_CAP = 30
+RETRY_STATUS = {429, 500, 502, 503, 504}
+TIMEOUT = 30
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+buckets = {host: TokenBucket(rate) for host, rate in RATE_LIMITS.items()}
+stats = {}
+stats_lock = threading.Lock()
+
+
+def set_rate_limit(rate, host=None):
+    # Used by worker processes so that together they stay within the API key's quota
+    host = host or urlparse(SKYNET_BASE_URL).netloc
+    buckets[host] = TokenBucket(rate)
+
+
+def record(endpoint, latency, error=False, retry=False):
+    with stats_lock:
+        endpoint_stats = stats.setdefault(endpoint, {'requests': 0, 'errors': 0, 'retries': 0, 'latency': 0.0})
+        endpoint_stats['requests'] += 1
+        endpoint_stats['latency'] += latency
+        if error:
+            endpoint_stats['errors'] += 1
+        if retry:
+            endpoint_stats['retries'] += 1
+
+
+def backoff(attempt, response=None):
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def request(method, url, **kwargs):
+    parsed = urlparse(url)
+    endpoint = f"{parsed.netloc}{parsed.path}"
+    bucket = buckets.get(parsed.netloc)
+    kwargs.setdefault('timeout', TIMEOUT)
+
+    for attempt in range(MAX_RETRIES + 1):
+        last_attempt = attempt == MAX_RETRIES
+        if bucket:
+            bucket.acquire()
+        started = time.monotonic()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            record(endpoint, time.monotonic() - started, error=True, retry=not last_attempt)
+            if last_attempt:
+                raise
+            time.sleep(backoff(attempt))
+            continue
+
+        failed = response.status_code >= 400
+        retryable = response.status_code in RETRY_STATUS
+        record(endpoint, time.monotonic() - started, error=failed, retry=retryable and not last_attempt)
+        if retryable and not last_attempt:
+            time.sleep(backoff(attempt, response))
+            continue
+        response.raise_for_status()
+        return response
+
+
+def post_json(url, payload, api_key=None):
+    headers = {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json',
+    }
+    if api_key:
+        headers['X-API-KEY'] = api_key
+    return request("POST", url, headers=headers, data=json.dumps(payload)).json()
+
+
+def get_json(url):
+    return request("GET", url, headers={'Accept': 'application/json'}).json()
+
+
+def print_stats():
+    with stats_lock:
+        for endpoint, endpoint_stats in sorted(stats.items()):
+            average = endpoint_stats['latency'] / endpoint_stats['requests'] * 1000
+            print(f"{endpoint}: {endpoint_stats['requests']} requests, {endpoint_stats['errors']} errors, "
+                  f"{endpoint_stats['retries']} retries, {average:.0f} ms average latency")
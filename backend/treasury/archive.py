@@ -0,0 +1,133 @@
+import os
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from treasury.store import TRANSFER_KEY
+
+# Parquet archive of the raw transfers, one file per treasury and month in a hive-partitioned
+# dataset (treasury=<address>/month=<YYYY-MM>/transfers.parquet) with typed columns.
+# value keeps the exact raw amount as a string next to the float std_value.
+# Exports are incremental: the newest month already exported, which may still be receiving
+# transfers, and every later month are written. full=True rewrites every month.
+# The months are found by seeking the blockTime index once per month, never by grouping the
+# whole collection.
+
+SCHEMA = pa.schema([
+    ('transactionHash', pa.string()),
+    ('logIndex', pa.int64()),
+    ('tokenId', pa.string()),
+    ('blockNumber', pa.int64()),
+    ('timestamp', pa.timestamp('s', tz='UTC')),
+    ('contractAddress', pa.string()),
+    ('tokenSymbol', pa.dictionary(pa.int32(), pa.string())),
+    ('tokenStandard', pa.dictionary(pa.int32(), pa.string())),
+    ('from', pa.string()),
+    ('to', pa.string()),
+    ('value', pa.string()),
+    ('std_value', pa.float64()),
+    ('feeType', pa.dictionary(pa.int32(), pa.string())),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([('treasury', pa.string()), ('month', pa.string())]), flavor='hive')
+
+
+def month_of(block_time):
+    return datetime.fromtimestamp(block_time, timezone.utc).strftime('%Y-%m')
+
+
+def month_range(month):
+    # Unix timestamps of the first second of the month and of the next month
+    start = datetime.strptime(month, '%Y-%m').replace(tzinfo=timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def stored_months(collection, since=None):
+    # Months with transfers from 'since' (a unix timestamp) on, or from the first transfer
+    months = set()
+    start = since
+    while True:
+        query = {'blockTime': {'$ne': None} if start is None else {'$gte': start}}
+        first = collection.find_one(query, {'_id': 0, 'blockTime': 1}, sort=[('blockTime', 1)])
+        if not first:
+            return months
+        month = month_of(first['blockTime'])
+        months.add(month)
+        start = month_range(month)[1]
+
+
+def partition_path(root, treasury, month):
+    return os.path.join(root, f"treasury={treasury}", f"month={month}", "transfers.parquet")
+
+
+def exported_months(root, treasury):
+    treasury_path = os.path.join(root, f"treasury={treasury}")
+    if not os.path.isdir(treasury_path):
+        return set()
+    return {name.split('=', 1)[1] for name in os.listdir(treasury_path)
+            if name.startswith('month=') and os.path.exists(os.path.join(treasury_path, name, 'transfers.parquet'))}
+
+
+def to_row(document):
+    return {
+        'transactionHash': document.get('transactionHash'),
+        'logIndex': document.get('logIndex'),
+        'tokenId': None if document.get('tokenId') is None else str(document['tokenId']),
+        'blockNumber': document.get('blockNumber'),
+        'timestamp': document.get('blockTime'),
+        'contractAddress': document.get('contractAddress'),
+        'tokenSymbol': document.get('tokenSymbol'),
+        'tokenStandard': document.get('tokenStandard'),
+        'from': document.get('from'),
+        'to': document.get('to'),
+        'value': None if document.get('value') is None else str(document['value']),
+        'std_value': document.get('std_value'),
+        'feeType': document.get('feeType'),
+    }
+
+
+def write_partition(root, treasury, month, collections):
+    # Transfers of one treasury and month from all its collections, each transfer once
+    start, end = month_range(month)
+    rows = {}
+    for collection in collections:
+        for document in collection.find({'blockTime': {'$gte': start, '$lt': end}}, {'_id': 0}):
+            rows.setdefault(tuple(str(document.get(field)) for field in TRANSFER_KEY), to_row(document))
+
+    table = pa.Table.from_pylist(sorted(rows.values(), key=lambda row: (row['blockNumber'] or 0, row['logIndex'] or 0)),
+                                 schema=SCHEMA)
+    path = partition_path(root, treasury, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Written next to the final file and swapped in, readers never see a half-written partition
+    temporary_path = os.path.join(os.path.dirname(path), '.transfers.parquet.tmp')
+    pq.write_table(table, temporary_path, compression='zstd')
+    os.replace(temporary_path, path)
+    return table.num_rows
+
+
+def export_treasury(root, treasury, collections, full=False):
+    # Returns {month: rows} of the partitions written
+    done = exported_months(root, treasury)
+    since = None
+    if not full and done:
+        newest = max(done)  # May have grown since
+        since = month_range(newest)[0]
+        done.discard(newest)
+
+    months = set()
+    for collection in collections:
+        months |= stored_months(collection, since)
+    written = {}
+    for month in sorted(months if full else months - done):
+        written[month] = write_partition(root, treasury, month, collections)
+    return written
+
+
+def load_transfers(root, columns=None, filter=None):
+    # Reads the archive without a database, e.g. load_transfers(root, ['timestamp', 'std_value'],
+    # (ds.field('treasury') == address) & (ds.field('month') >= '2024-01')).to_pandas()
+    dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+    return dataset.to_table(columns=columns, filter=filter)
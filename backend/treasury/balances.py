@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING
+
+from treasury.api_client import SKYNET_BASE_URL, post_json
+
+# Compact balance snapshots. The 'balance_latest' collection holds one document per owner
+# (_id = owner address) with the slim per-token rows of the newest balance summary, so the
+# current balance is a single _id lookup. The 'balance' collection is the history: a snapshot
+# only stores the rows whose balance changed since the previous one (balance '0' for tokens
+# that are gone) and a run without any change stores nothing.
+
+SUMMARY_URL = f"{SKYNET_BASE_URL}/skynet/ronin/tokens/balances/summary"
+TOKEN_STANDARDS = ["ERC20", "ERC721", "ERC1155"]
+LATEST = 'balance_latest'
+HISTORY = 'balance'
+ROW_FIELDS = ['contractAddress', 'tokenSymbol', 'tokenName', 'tokenStandard', 'decimals', 'balance', 'std_value']
+
+
+def fetch_summary(owner, api_key):
+    # Balance summary items of an owner, RON included
+    payload = {"includes": ["RON"], "ownerAddress": owner, "tokenStandards": TOKEN_STANDARDS}
+    return post_json(SUMMARY_URL, payload, api_key).get('result', {}).get('items', [])
+
+
+def slim_row(item):
+    row = {field: item.get(field) for field in ROW_FIELDS}
+    row['contractAddress'] = (row['contractAddress'] or '').lower()
+    return row
+
+
+def changed_rows(previous, rows):
+    # Rows of 'rows' that differ in balance from 'previous', plus a zero row per vanished token
+    before = {row['contractAddress']: row for row in previous}
+    after = {row['contractAddress']: row for row in rows}
+    changes = [row for address, row in after.items()
+               if address not in before or before[address]['balance'] != row['balance']]
+    changes += [{**row, 'balance': '0', 'std_value': 0.0} for address, row in before.items() if address not in after]
+    return changes
+
+
+def store_balances(db, owner, items, timestamp=None):
+    # Returns the number of changed rows stored in the history
+    owner = owner.lower()
+    timestamp = timestamp or datetime.now(timezone.utc)
+    rows = [slim_row(item) for item in items]
+    latest = db[LATEST].find_one({'_id': owner})
+
+    changes = changed_rows(latest['items'] if latest else [], rows)
+    if changes:
+        db[HISTORY].insert_one({'ownerAddress': owner, 'timestamp': timestamp, 'items': changes})
+    db[LATEST].replace_one({'_id': owner}, {'ownerAddress': owner, 'timestamp': timestamp, 'items': rows}, upsert=True)
+    return len(changes)
+
+
+def balances_at(db, owner, date):
+    # Per-token rows of 'owner' as of 'date', replayed from the history
+    rows = {}
+    for snapshot in db[HISTORY].find({'ownerAddress': owner.lower(), 'timestamp': {'$lte': date}}).sort('timestamp', ASCENDING):
+        for row in snapshot['items']:
+            rows[row['contractAddress']] = row
+    return [row for row in rows.values() if row['balance'] != '0']
+
+
+def compact_history(db):
+    # Rewrites the full balance summaries stored before snapshots were slimmed, oldest first
+    full_snapshots = list(db[HISTORY].find({'result.items': {'$exists': True}}).sort('timestamp', ASCENDING))
+    previous = {}
+    n = 0
+    for snapshot in full_snapshots:
+        items = snapshot['result']['items']
+        owner = (items[0].get('ownerAddress') if items else '').lower()
+        rows = [slim_row(item) for item in items]
+        changes = changed_rows(previous[owner][1] if owner in previous else [], rows)
+        if changes:
+            db[HISTORY].replace_one({'_id': snapshot['_id']},
+                                    {'ownerAddress': owner, 'timestamp': snapshot['timestamp'], 'items': changes})
+        else:
+            db[HISTORY].delete_one({'_id': snapshot['_id']})
+        previous[owner] = (snapshot['timestamp'], rows)
+        n += 1
+
+    for owner, (timestamp, rows) in previous.items():
+        if not db[LATEST].find_one({'_id': owner}):
+            db[LATEST].insert_one({'_id': owner, 'ownerAddress': owner, 'timestamp': timestamp, 'items': rows})
+    return n
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+# Days whose transfers changed since the last rollup, per source collection, stored in the
+# 'dirty_days' collection. Ingestion, std value repairs and fee type (re)classification mark
+# the days they touch; daily_rollup re-aggregates only those days and then clears them.
+# Days are unix timestamps of UTC midnight, like treasury/rollup.py's day_of().
+
+DAY_SECONDS = 86400
+
+
+def day_of(block_time):
+    return block_time - block_time % DAY_SECONDS
+
+
+def mark_dirty(collection, block_times):
+    days = {day_of(block_time) for block_time in block_times if block_time is not None}
+    if not days:
+        return 0
+    marked_at = datetime.now(timezone.utc)
+    collection.database['dirty_days'].bulk_write([
+        UpdateOne(
+            {'_id': f"{collection.name}:{day}"},
+            {'$set': {'collection': collection.name, 'day': day, 'marked_at': marked_at}},
+            upsert=True
+        )
+        for day in sorted(days)
+    ], ordered=False)
+    return len(days)
+
+
+def mark_dirty_matching(collection, query):
+    # Marks the days of the transfers a bulk update is about to touch
+    return mark_dirty(collection, (doc.get('blockTime') for doc in collection.find(query, {'_id': 0, 'blockTime': 1})))
+
+
+def dirty_days(collection):
+    return {doc['day'] for doc in collection.database['dirty_days'].find({'collection': collection.name}, {'day': 1})}
+
+
+def clear_dirty(collection, days, before):
+    # Days marked again after 'before' stay dirty, the rollup that started earlier may have missed them
+    collection.database['dirty_days'].delete_many({
+        'collection': collection.name,
+        'day': {'$in': sorted(days)},
+        'marked_at': {'$lte': before}
+    })
@@ -0,0 +1,29 @@
+from treasury.std_values import std_value
+from treasury.fee_types import resolve_fee_types
+
+# Enrichment applied while a page of transfers is parsed, so every transfer is inserted
+# once in its final form: std_value is set from the raw value and, when fees are
+# classified, the feeType of each transaction is resolved before the insert (through the
+# transaction cache in db, when given).
+# 3_stdValues.py and 4_feeType.py remain as repair tools for documents missing those fields.
+
+
+def is_axie_material(item):
+    # Same rule as 2_deleteAM.py, AM transfers confuse the fee type definition
+    return item.get('feeType') == "partsEvol" and item.get('tokenSymbol') == "AM"
+
+
+def enrich(items, api_key, classify_fees=False, db=None):
+    for item in items:
+        if 'value' in item:
+            item['std_value'] = std_value(item)
+
+    if not classify_fees:
+        return items
+
+    fee_types = resolve_fee_types({item['transactionHash'] for item in items}, api_key, db)
+    for item in items:
+        # Transactions the API did not return stay unclassified for 4_feeType.py to retry
+        if item['transactionHash'] in fee_types:
+            item['feeType'] = fee_types[item['transactionHash']]
+    return [item for item in items if not is_axie_material(item)]
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+import pyarrow as pa
+
+# Exports collections to the JSON files the Streamlit pages read.
+# Documents are streamed from a cursor in timestamp order (the pages take the last entry as
+# the most recent one) and written compactly, one document per line, to a temporary file
+# that is renamed over the live file, so a page never reads a half-written export.
+# The daily series are also written as an uncompressed Arrow IPC file (<name>.arrow) with a
+# datetime64 timestamp and float64 value columns, streamed in record batches, which the pages
+# memory-map instead of parsing the JSON. Missing values are NaN rather than null so every
+# value column can be used in place.
+# The content hash of every file is kept in the 'export_state' collection; a file whose
+# content did not change since the last export is left untouched, the other one is replaced.
+
+SORT = [('timestamp', 1), ('_id', 1)]
+COLUMNAR = {'frontend_data', 'frontend_data_weekly', 'frontend_data_monthly', 'currency'}
+BATCH_SIZE = 1000
+SKIPPED_COLUMNS = {'_id', 'timestamp', 'date'}
+
+
+def write_documents(cursor, path):
+    # Returns the sha256 of the written content
+    content_hash = hashlib.sha256()
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('[')
+        for i, document in enumerate(cursor):
+            line = ('\n' if i == 0 else ',\n') + json.dumps(document, default=str, separators=(',', ':'))
+            file.write(line)
+            content_hash.update(line.encode('utf-8'))
+        file.write('\n]\n')
+    return content_hash.hexdigest()
+
+
+def column_schema(collection):
+    # timestamp, date (when stored) and a float64 column for every other field of the collection
+    names = {doc['_id'] for doc in collection.aggregate([
+        {"$project": {"keys": {"$map": {"input": {"$objectToArray": "$$ROOT"}, "in": "$$this.k"}}}},
+        {"$unwind": "$keys"},
+        {"$group": {"_id": "$keys"}}
+    ])}
+    fields = [pa.field('timestamp', pa.timestamp('ms'))]
+    if 'date' in names:
+        fields.append(pa.field('date', pa.int64()))
+    fields += [pa.field(name, pa.float64()) for name in sorted(names - SKIPPED_COLUMNS)]
+    return pa.schema(fields)
+
+
+def to_record_batch(documents, schema):
+    columns = {name: [document.get(name) for document in documents] for name in schema.names}
+    for name in set(schema.names) - SKIPPED_COLUMNS:
+        columns[name] = [float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+                         for value in columns[name]]
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def file_hash(path):
+    content_hash = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def write_columns(collection, path):
+    # Returns the sha256 of the written file
+    schema = column_schema(collection)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        batch = []
+        for document in collection.find().sort(SORT).batch_size(BATCH_SIZE):
+            batch.append(document)
+            if len(batch) == BATCH_SIZE:
+                writer.write_batch(to_record_batch(batch, schema))
+                batch = []
+        if batch:
+            writer.write_batch(to_record_batch(batch, schema))
+    return file_hash(path)
+
+
+def temporary_path_of(path):
+    return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+
+
+def export_collection(collection, output_path, columns_path=None):
+    # Returns True when a file was (re)written, False when the content was unchanged
+    state_collection = collection.database['export_state']
+    state_id = os.path.abspath(output_path)
+    os.makedirs(os.path.dirname(state_id), exist_ok=True)
+
+    # Hash field in export_state -> (written hash, temporary path, live path)
+    files = {'hash': (write_documents(collection.find().sort(SORT), temporary_path_of(output_path)),
+                      temporary_path_of(output_path), output_path)}
+    if columns_path:
+        files['columns_hash'] = (write_columns(collection, temporary_path_of(columns_path)),
+                                 temporary_path_of(columns_path), columns_path)
+
+    state = state_collection.find_one({'_id': state_id}) or {}
+    changed = {}
+    for key, (content_hash, temporary_path, path) in files.items():
+        if state.get(key) == content_hash and os.path.exists(path):
+            os.remove(temporary_path)
+        else:
+            os.replace(temporary_path, path)
+            changed[key] = content_hash
+    if not changed:
+        return False
+
+    state_collection.update_one(
+        {'_id': state_id},
+        {'$set': {'collection': collection.name, **changed, 'exported_at': datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    return True
+
+
+def export_collections(db, collection_names, output_base_path):
+    for collection_name in collection_names:
+        output_path = os.path.join(output_base_path, f'{collection_name}.json')
+        columns_path = os.path.join(output_base_path, f'{collection_name}.arrow') if collection_name in COLUMNAR else None
+        if export_collection(db[collection_name], output_path, columns_path):
+            print(f'Data exported to {output_path}')
+        else:
+            print(f'{collection_name} unchanged, {output_path} kept')
@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Declarative fee-type rules (fee_rules.json) compiled into hash-map lookups.
+# A rule matches a transfer on any combination of its contract, from and to address;
+# rules with singleTransfer only match transactions made of a single transfer.
+# Like the original if/elif chain, a transaction takes the rule of its first matching
+# transfer, and the earliest rule in the table when that transfer matches several.
+# Adding a category only needs a new entry in the table (or FEE_RULES_PATH pointing to another one).
+
+RULES_PATH = os.environ.get('FEE_RULES_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fee_rules.json'))
+FIELDS = {'contract': 'contractAddress', 'from': 'from', 'to': 'to'}
+UNKNOWN = "unknown"
+
+
+def load_rules(path=RULES_PATH):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compile_rules(rules):
+    # One lookup per rule shape (fields used, singleTransfer): joined addresses -> rule priority
+    tables = {}
+    for priority, rule in enumerate(rules):
+        fields = tuple(field for field in FIELDS if rule.get(field))
+        key = '|'.join(rule[field].lower() for field in fields)
+        tables.setdefault((fields, bool(rule.get('singleTransfer'))), {}).setdefault(key, priority)
+    return [(fields, single, lookup) for (fields, single), lookup in tables.items()]
+
+
+RULES = load_rules()
+TABLES = compile_rules(RULES)
+FEE_TYPES = list(dict.fromkeys(rule['feeType'] for rule in RULES))
+
+
+def transfer_priority(item, single_transfer, tables=TABLES):
+    best = None
+    for fields, single, lookup in tables:
+        if single and not single_transfer:
+            continue
+        priority = lookup.get('|'.join((item.get(FIELDS[field]) or '').lower() for field in fields))
+        if priority is not None and (best is None or priority < best):
+            best = priority
+    return best
+
+
+def classify_items(items, rules=RULES, tables=TABLES):
+    # Fee type of one transaction from its list of transfers
+    for item in items:
+        priority = transfer_priority(item, len(items) == 1, tables)
+        if priority is not None:
+            return rules[priority]['feeType']
+    return UNKNOWN
+
+
+def classify_transfers(transfers, rules=RULES, tables=TABLES):
+    # Vectorized classify_items() for many transactions at once. transfers is a DataFrame
+    # with transactionHash, contractAddress, from and to, each transaction's transfers in
+    # their original order. Returns a Series of fee types indexed by transaction hash.
+    if transfers.empty:
+        return pd.Series(dtype=object)
+
+    addresses = {
+        field: transfers[column].fillna('').str.lower() if column in transfers else pd.Series('', index=transfers.index)
+        for field, column in FIELDS.items()
+    }
+    single_transfer = transfers.groupby('transactionHash')['transactionHash'].transform('size') == 1
+
+    priority = pd.Series(np.nan, index=transfers.index)
+    for fields, single, lookup in tables:
+        keys = pd.Series('', index=transfers.index)
+        for i, field in enumerate(fields):
+            keys = addresses[field] if i == 0 else keys + '|' + addresses[field]
+        matched = keys.map(lookup)
+        if single:
+            matched = matched.where(single_transfer)
+        priority = np.fmin(priority, matched)
+
+    hashes = transfers['transactionHash']
+    first_match = priority[priority.notna()].groupby(hashes[priority.notna()], sort=False).first()
+    fee_types = first_match.astype(int).map(dict(enumerate(rule['feeType'] for rule in rules)))
+    return fee_types.reindex(hashes.unique(), fill_value=UNKNOWN)
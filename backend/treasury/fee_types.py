@@ -0,0 +1,131 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from pymongo import UpdateMany
+
+from treasury.api_client import SKYNET_BASE_URL, post_json, print_stats
+from treasury.dirty_days import mark_dirty_matching
+from treasury.timeseries import mirror_fee_types
+from treasury.fee_rules import classify_items, classify_transfers
+from treasury.tx_cache import cached_transactions, cache_transactions, print_cache_stats
+
+# Defines the fee type of each transaction from the full list of transfers it contains,
+# with the rule table in treasury/fee_rules.json
+
+TXS_URL = f"{SKYNET_BASE_URL}/skynet/ronin/tokens/transfers/txs"
+BATCH_SIZE = 100
+
+
+def determine_fee_type(doc):
+    return classify_items(doc.get('items', []))
+
+
+def classify_grouped(grouped_data):
+    # Fee type per transaction hash for a whole batch, classified in one vectorized pass
+    transfers = pd.DataFrame([item for items in grouped_data.values() for item in items],
+                             columns=['transactionHash', 'contractAddress', 'from', 'to'])
+    return classify_transfers(transfers).to_dict()
+
+
+def update_existing_data(grouped_data, collection):
+    # One bulk_write for the whole batch instead of an update_many round trip per hash
+    fee_types = classify_grouped(grouped_data)
+    if not fee_types:
+        return []
+    # Days of the transfers whose fee type changes need a new daily rollup
+    mark_dirty_matching(collection, {'$or': [
+        {'transactionHash': transaction_hash, 'feeType': {'$ne': fee_type}}
+        for transaction_hash, fee_type in fee_types.items()
+    ]})
+    operations = [
+        UpdateMany({'transactionHash': transaction_hash}, {'$set': {'feeType': fee_type}})
+        for transaction_hash, fee_type in fee_types.items()
+    ]
+    collection.bulk_write(operations, ordered=False)
+    mirror_fee_types(collection, fee_types)
+    return list(grouped_data)
+
+
+def group_by_transaction(items):
+    grouped_data = {}
+    for item in items:
+        transaction_hash = item['transactionHash']
+        if transaction_hash not in grouped_data:
+            grouped_data[transaction_hash] = []
+        grouped_data[transaction_hash].append(item)
+    return grouped_data
+
+
+def fetch_transactions(transaction_hashes, api_key, db=None):
+    # Full transfer lists of the given transactions, grouped by hash. With a database the
+    # tx_cache collection is read first and only the missing hashes go to the API.
+    transaction_hashes = list(transaction_hashes)
+    grouped_data = {}
+    if db is not None:
+        grouped_data = cached_transactions(db, transaction_hashes)
+        transaction_hashes = [transaction_hash for transaction_hash in transaction_hashes
+                              if transaction_hash not in grouped_data]
+
+    fetched_data = {}
+    for i in range(0, len(transaction_hashes), BATCH_SIZE):
+        payload = {
+            "transaction_hashes": transaction_hashes[i:i + BATCH_SIZE]
+        }
+        fetched_data.update(group_by_transaction(post_json(TXS_URL, payload, api_key)['result']['items']))
+
+    if db is not None:
+        cache_transactions(db, fetched_data)
+    grouped_data.update(fetched_data)
+    return grouped_data
+
+
+def resolve_fee_types(transaction_hashes, api_key, db=None):
+    return classify_grouped(fetch_transactions(transaction_hashes, api_key, db))
+
+
+def stored_hashes(collection, query=None, unclassified_only=True):
+    # Distinct hashes of the stored transfers, by default only those without a feeType;
+    # one transaction has several transfers
+    query = dict(query or {})
+    if unclassified_only:
+        query['feeType'] = {'$exists': False}
+    cursor = collection.find(query, {'_id': 0, 'transactionHash': 1}, batch_size=10000)
+    return list(dict.fromkeys(doc['transactionHash'] for doc in cursor if 'transactionHash' in doc))
+
+
+def classify_batch(collection, batch_hashes, api_key):
+    grouped_data = fetch_transactions(batch_hashes, api_key, collection.database)
+    return update_existing_data(grouped_data, collection)
+
+
+def classify_fee_types(collection, api_key, query=None, max_workers=8, reclassify=False):
+    # Only transactions that are not classified yet are processed, unless reclassify is set
+    # (e.g. after a rule change). Transfer lists come from tx_cache when possible, so only
+    # transactions never seen before cost an API call. Batches run concurrently.
+    transaction_hashes = stored_hashes(collection, query, unclassified_only=not reclassify)
+    total_hashes = len(transaction_hashes)
+    print(f"{'Stored' if reclassify else 'Unclassified'} transaction hashes collected: {total_hashes}")
+
+    updated_ids = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(classify_batch, collection, transaction_hashes[i:i + BATCH_SIZE], api_key): i // BATCH_SIZE + 1
+            for i in range(0, total_hashes, BATCH_SIZE)
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                batch_updated_ids = future.result()
+            except requests.RequestException as e:
+                print(f"Failed to fetch data from API for batch {batch}: {e}")
+                continue
+            except (ValueError, KeyError) as e:
+                print(f"Unexpected response for batch {batch}: {e}")
+                continue
+
+            updated_ids.extend(batch_updated_ids)
+            print(f"Classified {len(batch_updated_ids)} transactions in '{collection.name}' collection for batch {batch}.")
+
+    print_stats()
+    print_cache_stats()
+    return updated_ids
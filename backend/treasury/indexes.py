@@ -0,0 +1,114 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from treasury.rollup import WALLET, TOKENS, FEE_TYPES
+from treasury.store import TRANSFER_COLLECTIONS, ensure_transfer_index
+
+# Indexes matching the query shapes of the pipelines, created by ensure_indexes.py.
+# Transfer collections also get the unique transfer_key index (see treasury/store.py),
+# whose transactionHash prefix serves the fee type updates by hash.
+
+TRANSFER_INDEXES = [
+    # Daily rollups: equality on to, tokenSymbol and feeType, range on blockTime
+    ([('to', ASCENDING), ('tokenSymbol', ASCENDING), ('feeType', ASCENDING), ('blockTime', ASCENDING)], {}),
+    # Daily rollups, outflows of the treasury
+    ([('from', ASCENDING), ('tokenSymbol', ASCENDING), ('blockTime', ASCENDING)], {}),
+    # Unclassified transactions for 4_feeType.py and the AM clean-up of 2_deleteAM.py
+    ([('feeType', ASCENDING), ('transactionHash', ASCENDING)], {}),
+    # Follow mode: newest ingested block and the transfers of a block range
+    ([('blockNumber', ASCENDING)], {}),
+    # Parquet archive: the months with transfers and the transfers of a month
+    ([('blockTime', ASCENDING)], {}),
+]
+
+INDEXES = {
+    'frontend_data': [([('timestamp', ASCENDING)], {'unique': True})],
+    'frontend_data_weekly': [([('timestamp', ASCENDING)], {'unique': True})],
+    'frontend_data_monthly': [([('timestamp', ASCENDING)], {'unique': True})],
+    'currency': [([('timestamp', DESCENDING)], {})],
+    # Balance history of an owner; the latest balance is the _id of balance_latest
+    'balance': [([('ownerAddress', ASCENDING), ('timestamp', DESCENDING)], {})],
+}
+
+INDEX_CONFLICT_ERRORS = {85, 86}  # IndexOptionsConflict, IndexKeySpecsConflict
+
+
+def duplicate_values(collection, keys, limit=5):
+    key = {field: f"${field}" for field, _ in keys}
+    return [doc['_id'] for doc in collection.aggregate([
+        {"$group": {"_id": key, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit}
+    ], allowDiskUse=True)]
+
+
+def create_index(collection, keys, options):
+    # Unique indexes are never downgraded: the daily collections are $merge targets, which
+    # need them, so duplicates stop the run until they are removed
+    try:
+        return collection.create_index(keys, **options)
+    except OperationFailure as e:
+        if not options.get('unique'):
+            raise
+        if e.code in INDEX_CONFLICT_ERRORS:
+            # A non-unique index on the same keys, e.g. left by an earlier version, is replaced
+            collection.drop_index(keys)
+            return collection.create_index(keys, **options)
+        raise RuntimeError(f"Unique index on {collection.name} {keys} failed, duplicated values "
+                           f"{duplicate_values(collection, keys)} must be removed first: {e}") from e
+
+
+def ensure_indexes(db):
+    for collection_name in TRANSFER_COLLECTIONS:
+        ensure_transfer_index(db[collection_name])
+        for keys, options in TRANSFER_INDEXES:
+            create_index(db[collection_name], keys, options)
+
+    for collection_name, indexes in INDEXES.items():
+        for keys, options in indexes:
+            create_index(db[collection_name], keys, options)
+
+
+def winning_stages(plan):
+    # Stage names of a winning plan, outermost first, with the index each scan uses
+    stages = []
+    while plan:
+        stage = plan.get('stage', '?')
+        if 'indexName' in plan:
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get('inputStage') or (plan.get('inputStages') or [None])[0]
+    return stages
+
+
+def explain_summary(cursor):
+    explain = cursor.explain()
+    winning_plan = explain['queryPlanner']['winningPlan']
+    winning_plan = winning_plan.get('queryPlan', winning_plan)  # Plans run by the slot-based engine
+    execution = explain.get('executionStats', {})
+    return (f"{' <- '.join(winning_stages(winning_plan))}, {execution.get('nReturned', '?')} returned, "
+            f"{execution.get('totalKeysExamined', '?')} keys and {execution.get('totalDocsExamined', '?')} docs examined")
+
+
+def hot_queries(db):
+    rollup_match = {'to': WALLET, 'tokenSymbol': {'$in': TOKENS}, 'feeType': {'$in': FEE_TYPES}}
+    queries = []
+    for collection_name in TRANSFER_COLLECTIONS:
+        collection = db[collection_name]
+        queries += [
+            (f"{collection_name} daily rollup", collection.find(rollup_match)),
+            (f"{collection_name} unclassified", collection.find({'feeType': {'$exists': False}}, {'_id': 0, 'transactionHash': 1})),
+            (f"{collection_name} fee update by hash", collection.find({'transactionHash': '0x0'})),
+        ]
+    queries += [
+        ("new_txn newest block", db['new_txn'].find({}, {'blockNumber': 1}).sort('blockNumber', DESCENDING).limit(1)),
+        ("frontend_data upsert by day", db['frontend_data'].find({'timestamp': None})),
+        ("currency latest", db['currency'].find().sort('timestamp', DESCENDING).limit(1)),
+        ("balance latest", db['balance_latest'].find({'_id': WALLET})),
+    ]
+    return queries
+
+
+def print_explain(db):
+    for name, cursor in hot_queries(db):
+        print(f"{name}: {explain_summary(cursor)}")
@@ -0,0 +1,75 @@
+from pymongo import DESCENDING, UpdateOne
+
+from treasury.fee_rules import FEE_TYPES
+
+# Prefix-sum ledger over the daily frontend_data documents. Every daily field gets a running
+# total "cum_<field>" up to and including that day, plus per token "cum_<token>_inflow" (the
+# fee types of the rule table, other fields such as axs_totals would count twice) and
+# "cum_<token>_net" (inflow minus outflow). Range totals and positions are
+# then one or two indexed lookups, whatever the length of the history.
+# update_ledger() recomputes the totals from the first changed day onwards, or from the
+# first day when the day before has no running totals yet (history written before the ledger).
+
+CUM_PREFIX = "cum_"
+OUTFLOW = "outflow"
+SKIPPED_FIELDS = {"_id", "timestamp", "date"}
+BATCH_SIZE = 1000
+
+
+def daily_fields(document):
+    return {k: v for k, v in document.items()
+            if k not in SKIPPED_FIELDS and not k.startswith(CUM_PREFIX) and isinstance(v, (int, float))}
+
+
+def running_totals(running):
+    totals = {f"{CUM_PREFIX}{k}": v for k, v in running.items()}
+    for token in {k.split('_', 1)[0] for k in running}:
+        inflow = sum(running.get(f"{token}_{fee_type}", 0) for fee_type in FEE_TYPES)
+        totals[f"{CUM_PREFIX}{token}_inflow"] = inflow
+        totals[f"{CUM_PREFIX}{token}_net"] = inflow - running.get(f"{token}_{OUTFLOW}", 0)
+    return totals
+
+
+def update_ledger(frontend_data, since=None):
+    # Recomputes the running totals of every day from 'since' (a datetime), or of all days
+    running = {}
+    query = {}
+    if since is not None:
+        query = {"timestamp": {"$gte": since}}
+        previous = frontend_data.find_one({"timestamp": {"$lt": since}}, sort=[("timestamp", DESCENDING)])
+        if previous and any(f"{CUM_PREFIX}{k}" not in previous for k in daily_fields(previous)):
+            return update_ledger(frontend_data)
+        if previous:
+            running = {k[len(CUM_PREFIX):]: v for k, v in previous.items()
+                       if k.startswith(CUM_PREFIX) and not k.endswith(("_inflow", "_net"))}
+
+    n = 0
+    operations = []
+    for document in frontend_data.find(query).sort("timestamp", 1):
+        for k, v in daily_fields(document).items():
+            running[k] = running.get(k, 0) + v
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$set": running_totals(running)}))
+        if len(operations) == BATCH_SIZE:
+            n += frontend_data.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        n += frontend_data.bulk_write(operations, ordered=False).modified_count
+    return n
+
+
+def ledger_at(frontend_data, date, inclusive=True):
+    # Running totals at the end of the last day up to 'date' (before it when not inclusive)
+    document = frontend_data.find_one({"timestamp": {"$lte" if inclusive else "$lt": date}},
+                                      sort=[("timestamp", DESCENDING)])
+    return {k: v for k, v in (document or {}).items() if k.startswith(CUM_PREFIX)}
+
+
+def range_total(frontend_data, field, start, end):
+    # Sum of a daily field over the days from start to end, both included
+    key = f"{CUM_PREFIX}{field}"
+    return ledger_at(frontend_data, end).get(key, 0) - ledger_at(frontend_data, start, inclusive=False).get(key, 0)
+
+
+def net_position(frontend_data, token, date):
+    # Inflows minus outflows of a token from the start of the history up to 'date'
+    return ledger_at(frontend_data, date).get(f"{CUM_PREFIX}{token.lower()}_net", 0)
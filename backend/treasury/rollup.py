@@ -0,0 +1,308 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import SON
+from pymongo import ASCENDING, DESCENDING
+
+from treasury.dirty_days import DAY_SECONDS, day_of, dirty_days, clear_dirty
+from treasury import timeseries
+from treasury.fee_rules import FEE_TYPES
+from treasury.ledger import CUM_PREFIX, OUTFLOW, update_ledger
+
+# Merges WETH and AXS transactions into daily sums per fee type (inflows) and per token
+# (outflows) and stores them in frontend_data, with the running totals of treasury/ledger.py.
+# A single aggregation covers every token and fee type (needs MongoDB 5.0 for $dateTrunc),
+# over one source collection plus any others added with $unionWith (union=[(collection, wallet)]).
+# Only the days marked dirty since the last run are re-aggregated (see treasury/dirty_days.py),
+# or the given days (unix timestamps of UTC midnight), or every day with full=True.
+# The fields a rollup owns are first set to 0 on those days, then the sums are written with
+# one $merge on the unique timestamp index of frontend_data, so a day whose transfers were
+# all removed or reclassified does not keep its old sums. A full rebuild only zeroes the days
+# from the first to the last transfer of its sources, the other days may hold the sums another
+# rollup wrote into the same field (weth_marketplace from 2024 on).
+# With TRANSFER_STORAGE=timeseries the sums are read from the time-series twins of the sources
+# (see treasury/timeseries.py).
+# Weekly (Monday based) and monthly sums of the daily documents are kept in
+# frontend_data_weekly and frontend_data_monthly, re-aggregated for the periods that changed.
+
+WALLET = "0x245db945c485b68fdc429e4f7085a1761aa4d45d"
+TOKENS = ["WETH", "AXS"]
+PERIODS = {"week": "weekly", "month": "monthly"}
+
+# Written by the WETH track (2_weth_track/4_frontendData.py) from new_treasury and old_treasury.
+# The 2024 track still writes its sums there on days with marketplace transfers, but never
+# zeroes them.
+SHARED_FIELDS = {"weth_marketplace"}
+
+# Field paths of the transfers in a regular collection and in its time-series twin
+TRANSFER_FIELDS = {"token": "tokenSymbol", "feeType": "feeType"}
+TIMESERIES_FIELDS = {"token": "meta.tokenSymbol", "feeType": "meta.feeType"}
+
+
+def days_filter(days, use_timeseries=False):
+    if use_timeseries:
+        return {"$or": [{"timestamp": {"$gte": datetime.fromtimestamp(day, timezone.utc),
+                                       "$lt": datetime.fromtimestamp(day + DAY_SECONDS, timezone.utc)}}
+                        for day in sorted(days)]}
+    return {"$or": [{"blockTime": {"$gte": day, "$lt": day + DAY_SECONDS}} for day in sorted(days)]}
+
+
+def output_fields(tokens=TOKENS, fee_types=FEE_TYPES, inflow_field=None, outflows=True):
+    # Daily fields a rollup writes: "<token>_<feeType>", or "<token>_<inflow_field>" for all
+    # inflows, and "<token>_outflow"
+    names = [inflow_field] if inflow_field else list(fee_types)
+    fields = [f"{token.lower()}_{name}" for token in tokens for name in names]
+    if outflows:
+        fields += [f"{token.lower()}_{OUTFLOW}" for token in tokens]
+    return fields
+
+
+def owned_zeros(tokens=TOKENS, fee_types=FEE_TYPES, inflow_field=None, outflows=True, keep_fields=SHARED_FIELDS):
+    return {field: 0 for field in output_fields(tokens, fee_types, inflow_field, outflows) if field not in keep_fields}
+
+
+def transfer_data(collection):
+    # Dirty days are tracked on the regular collections, the sums come from their time-series twins if enabled
+    return timeseries.timeseries_collection(collection) if timeseries.ENABLED else collection
+
+
+def source_stages(wallet=WALLET, tokens=TOKENS, fee_types=FEE_TYPES, days=None, use_timeseries=False, max_value=None,
+                  inflow_field=None, outflows=True):
+    # Transfers of one source as {timestamp: day, field, std_value}
+    fields = TIMESERIES_FIELDS if use_timeseries else TRANSFER_FIELDS
+    inflow = {"to": wallet}
+    if use_timeseries:
+        # The address the source was scanned for, equal to "to" for inflows; lets the meta index narrow the scan
+        inflow["meta.treasury"] = wallet
+    if inflow_field is None:
+        inflow[fields["feeType"]] = {"$in": list(fee_types)}
+    match = {
+        fields["token"]: {"$in": list(tokens)},
+        # Self-transfers are not outflows, only inflows when their fee type is matched
+        "$or": [inflow, {"from": wallet, "to": {"$ne": wallet}}] if outflows else [inflow]
+    }
+    if max_value is not None:
+        match["std_value"] = {"$lt": max_value}
+    if days is not None:
+        match["$and"] = [days_filter(days, use_timeseries)]
+    # Time-series documents already carry the block time as a date
+    block_date = "$timestamp" if use_timeseries else {"$toDate": {"$multiply": ["$blockTime", 1000]}}
+    token = {"$toLower": f"${fields['token']}"}
+    inflow_name = f"_{inflow_field}" if inflow_field else {"$concat": ["_", f"${fields['feeType']}"]}
+
+    return [
+        {
+            "$match": match
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "timestamp": {
+                    "$dateTrunc": {
+                        "date": block_date,
+                        "unit": "day"
+                    }
+                },
+                "field": {
+                    "$cond": [
+                        {"$eq": ["$to", wallet]},
+                        {"$concat": [token, inflow_name]},
+                        {"$concat": [token, f"_{OUTFLOW}"]}
+                    ]
+                },
+                "std_value": 1
+            }
+        }
+    ]
+
+
+def create_pipeline(wallet=WALLET, tokens=TOKENS, fee_types=FEE_TYPES, days=None, use_timeseries=False, union=(),
+                    max_value=None, inflow_field=None, outflows=True, keep_fields=SHARED_FIELDS):
+    # One pass over the sources: daily inflow sums per (day, token, fee type) and outflow sums
+    # per (day, token), pivoted into one document per day with a field for every pair (see
+    # output_fields()). Owned fields without transfers that day are 0 on new documents.
+    zeros = owned_zeros(tokens, fee_types, inflow_field, outflows, keep_fields)
+    options = dict(tokens=tokens, fee_types=fee_types, days=days, use_timeseries=use_timeseries, max_value=max_value,
+                   inflow_field=inflow_field, outflows=outflows)
+    # union holds the names of the other source collections with their wallet
+    unions = [{"$unionWith": {"coll": name, "pipeline": source_stages(other_wallet, **options)}}
+              for name, other_wallet in union]
+
+    return source_stages(wallet, **options) + unions + [
+        {
+            "$group": {
+                "_id": {"timestamp": "$timestamp", "field": "$field"},
+                "daily_sum": {"$sum": "$std_value"}
+            }
+        },
+        {
+            "$group": {
+                "_id": "$_id.timestamp",
+                "sums": {
+                    "$push": {
+                        "k": "$_id.field",
+                        "v": "$daily_sum"
+                    }
+                }
+            }
+        },
+        {
+            "$replaceRoot": {
+                "newRoot": {"$mergeObjects": [{"timestamp": "$_id"}, zeros, {"$arrayToObject": "$sums"}]}
+            }
+        },
+        {
+            "$sort": SON([("timestamp", 1)])
+        }
+    ]
+
+
+def merge_stages(frontend_data, add_date=True):
+    stages = []
+    if add_date:
+        stages.append({"$addFields": {"date": {"$toLong": {"$divide": [{"$toLong": "$timestamp"}, 1000]}}}})
+    stages.append({
+        "$merge": {
+            "into": frontend_data.name,
+            "on": "timestamp",
+            "whenMatched": "merge",
+            "whenNotMatched": "insert"
+        }
+    })
+    return stages
+
+
+def source_span(sources):
+    # First and last day with transfers in the sources, None when they are all empty
+    block_times = [document["blockTime"] for collection in sources for direction in (ASCENDING, DESCENDING)
+                   for document in collection.find({"blockTime": {"$ne": None}}, {"_id": 0, "blockTime": 1})
+                   .sort("blockNumber", direction).limit(1)]
+    if not block_times:
+        return None
+    return day_of(min(block_times)), day_of(max(block_times))
+
+
+def zero_days(frontend_data, zeros, days=None, span=None):
+    # Resets the owned fields of the re-aggregated days before the $merge: the given days, or
+    # when days is None the days of span (first, last), nothing without a span
+    if not zeros:
+        return 0
+    if days is not None:
+        query = {"timestamp": {"$in": [datetime.fromtimestamp(day, timezone.utc) for day in sorted(days)]}}
+    elif span is not None:
+        query = {"timestamp": {"$gte": datetime.fromtimestamp(span[0], timezone.utc),
+                               "$lt": datetime.fromtimestamp(span[1] + DAY_SECONDS, timezone.utc)}}
+    else:
+        return 0
+    return frontend_data.update_many(query, {"$set": zeros}).modified_count
+
+
+def daily_rollup(source, frontend_data, wallet=WALLET, tokens=TOKENS, fee_types=FEE_TYPES, days=None, add_date=True,
+                 full=False, union=(), max_value=None, inflow_field=None, outflows=True, keep_fields=SHARED_FIELDS):
+    # Returns how many days were re-aggregated, None for a full rebuild.
+    # union: other (collection, wallet) sources summed into the same fields, max_value: only
+    # transfers below it, inflow_field: one "<token>_<inflow_field>" sum over all fee types,
+    # keep_fields: fields owned by another rollup, not zeroed.
+    started = datetime.now(timezone.utc)
+    sources = [source] + [collection for collection, _ in union]
+    if full:
+        days = None
+    elif days is None:
+        days = set().union(*(dirty_days(collection) for collection in sources))
+    if days is not None and not days:
+        return 0
+
+    # The sort only matters to readers of the pipeline output, not to $merge
+    pipeline = create_pipeline(wallet, tokens, fee_types, days, timeseries.ENABLED,
+                               [(transfer_data(collection).name, other_wallet) for collection, other_wallet in union],
+                               max_value, inflow_field, outflows, keep_fields)[:-1] + merge_stages(frontend_data, add_date)
+
+    frontend_data.create_index([("timestamp", ASCENDING)], unique=True)  # Required by $merge
+    zero_days(frontend_data, owned_zeros(tokens, fee_types, inflow_field, outflows, keep_fields), days,
+              source_span(sources) if days is None else None)
+    transfer_data(source).aggregate(pipeline, allowDiskUse=True)
+    update_ledger(frontend_data, None if days is None else datetime.fromtimestamp(min(days), timezone.utc))
+    period_rollups(frontend_data, days)
+
+    for collection in sources:
+        clear_dirty(collection, dirty_days(collection) if days is None else days, started)
+    return None if days is None else len(days)
+
+
+def period_collection(frontend_data, unit):
+    return frontend_data.database[f"{frontend_data.name}_{PERIODS[unit]}"]
+
+
+def period_range(day, unit):
+    # First and next period start (datetimes) of the period containing a day
+    date = datetime.fromtimestamp(day, timezone.utc).replace(tzinfo=None)
+    if unit == "week":
+        start = date - timedelta(days=date.weekday())
+        return start, start + timedelta(days=7)
+    start = date.replace(day=1)
+    return start, (start + timedelta(days=31)).replace(day=1)
+
+
+def create_period_pipeline(frontend_data, unit, days=None):
+    # Sums every numeric field of the daily documents into one document per period,
+    # except the running totals of the ledger
+    truncate = {"date": "$timestamp", "unit": unit}
+    if unit == "week":
+        truncate["startOfWeek"] = "monday"
+
+    pipeline = []
+    if days is not None:
+        ranges = sorted({period_range(day, unit) for day in days})
+        pipeline.append({"$match": {"$or": [{"timestamp": {"$gte": start, "$lt": end}} for start, end in ranges]}})
+    return pipeline + [
+        {
+            "$project": {
+                "_id": 0,
+                "period": {"$dateTrunc": truncate},
+                "fields": {"$objectToArray": "$$ROOT"}
+            }
+        },
+        {
+            "$unwind": "$fields"
+        },
+        {
+            "$match": {
+                "fields.k": {"$nin": ["_id", "timestamp", "date"], "$not": {"$regex": f"^{CUM_PREFIX}"}},
+                "fields.v": {"$type": "number"}
+            }
+        },
+        {
+            "$group": {
+                "_id": {"period": "$period", "k": "$fields.k"},
+                "v": {"$sum": "$fields.v"}
+            }
+        },
+        {
+            "$group": {
+                "_id": "$_id.period",
+                "sums": {"$push": {"k": "$_id.k", "v": "$v"}}
+            }
+        },
+        {
+            "$replaceRoot": {
+                "newRoot": {"$mergeObjects": [{"timestamp": "$_id"}, {"$arrayToObject": "$sums"}]}
+            }
+        },
+        {
+            "$addFields": {"date": {"$toLong": {"$divide": [{"$toLong": "$timestamp"}, 1000]}}}
+        },
+        {
+            "$merge": {
+                "into": period_collection(frontend_data, unit).name,
+                "on": "timestamp",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }
+        }
+    ]
+
+
+def period_rollups(frontend_data, days=None):
+    # Re-aggregates the weeks and months containing the given days, or all of them
+    for unit in PERIODS:
+        period_collection(frontend_data, unit).create_index([("timestamp", ASCENDING)], unique=True)
+        frontend_data.aggregate(create_period_pipeline(frontend_data, unit, days), allowDiskUse=True)
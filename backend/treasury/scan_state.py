@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+# Scan progress per (collection, address), stored in the 'scan_state' collection.
+# Sharded scans keep one state per shard, keyed by the shard's first block as well.
+# committed_block is the high-water mark: every block up to it has been fully stored.
+# done_windows holds windows past the mark that finished while an earlier one was
+# still in flight, so a restart never downloads them again.
+
+
+def state_id(collection, address, shard=None):
+    if shard is None:
+        return f"{collection.name}:{address}"
+    return f"{collection.name}:{address}:{shard}"
+
+
+def load_state(collection, address, shard=None):
+    state_collection = collection.database['scan_state']
+    return state_collection.find_one({'_id': state_id(collection, address, shard)})
+
+
+def save_progress(collection, address, committed_block, done_windows, shard=None):
+    state_collection = collection.database['scan_state']
+    state_collection.update_one(
+        {'_id': state_id(collection, address, shard)},
+        {'$set': {
+            'collection': collection.name,
+            'address': address,
+            'shard': shard,
+            'committed_block': committed_block,
+            'done_windows': [[first_block, last_block] for first_block, last_block in sorted(done_windows.items())],
+            'updated_at': datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
+
@@ -0,0 +1,247 @@
+import math
+import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from treasury.api_client import SKYNET_BASE_URL, post_json, print_stats
+from treasury.enrich import enrich
+from treasury.scan_state import load_state, save_progress
+from treasury.std_values import load_decimals
+from treasury.store import ensure_transfer_index, upsert_transfers
+from treasury.tx_cache import print_cache_stats
+
+# Shared block-window scanner for the Skynet transfers search endpoint.
+# Block windows are fetched concurrently by a bounded thread pool. Each window walks
+# its pages with cursor (keyset) paging, so deep pages cost the same as the first one;
+# when the API does not accept cursor paging the scanner falls back to offset paging.
+# A window ends when the cursor runs out, or in offset mode on an empty page (or a page
+# shorter than the page size the server reports): the server may cap pages below PAGE_LIMIT.
+# Every page is enriched (std_value, and feeType when classify_fees is set) and then
+# upserted into the target collection, so transfers already stored are skipped
+# (see treasury/enrich.py and treasury/store.py).
+# The window size adapts to the transfer density seen so far: it grows across quiet
+# ranges and shrinks when a window overflows into several pages.
+# Progress is committed to 'scan_state' after every window, so a restarted scan
+# continues from the last committed block (see treasury/scan_state.py).
+
+SEARCH_URL = f"{SKYNET_BASE_URL}/skynet-tx-query/ronin/tokens/transfers/search"
+RPC_URL = "https://api.roninchain.com/rpc"
+PAGE_LIMIT = 200
+
+BASELINE_BLOCK_STEP = 200  # Fixed step used by the original scan scripts
+MIN_BLOCK_STEP = 10
+MAX_BLOCK_STEP = 20000
+TARGET_PAGE_FILL = 0.75  # Aim for windows that fit in a single, mostly full page
+MAX_GROWTH = 4
+
+CURSOR_REJECTED_STATUS = {400, 404, 422}
+cursor_paging = {'supported': True}  # Switched off for the whole run once the API rejects it
+
+
+def latest_block():
+    # Current Ronin chain height from the public JSON-RPC endpoint
+    response_json = post_json(RPC_URL, {"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1})
+    return int(response_json['result'], 16)
+
+
+def search_transfers(address, first_block, last_block, api_key, offset=0, cursor=None, paging_style="offset"):
+    paging = {
+        "limit": PAGE_LIMIT,
+        "pagingStyle": paging_style
+    }
+    if paging_style == "cursor":
+        if cursor is not None:
+            paging["cursor"] = cursor
+    else:
+        paging["offset"] = offset
+
+    payload = {
+        "address": {
+            "relateTo": address,
+        },
+        "block": {
+            "blockRange": [
+                first_block,
+                last_block
+            ]
+        },
+        "paging": paging,
+    }
+    return post_json(SEARCH_URL, payload, api_key)
+
+
+def next_cursor(result):
+    paging = result.get('paging') or {}
+    return paging.get('nextCursor') or result.get('nextCursor')
+
+
+def has_cursor_field(result):
+    # True when the response answers in cursor style, even with a null cursor on the last page
+    return 'nextCursor' in (result.get('paging') or {}) or 'nextCursor' in result
+
+
+def reported_page_size(result):
+    # Page size the server says it used, None when it does not report one
+    paging = result.get('paging') or {}
+    return paging.get('limit') or result.get('limit')
+
+
+def fetch_window(collection, address, first_block, last_block, api_key, paging_style="cursor", classify_fees=False):
+    # Walks all pages of one block window, returns (requests made, transfers fetched, new documents)
+    requests_made = 0
+    fetched = 0
+    documents = 0
+    offset = 0
+    cursor = None
+    use_cursor = paging_style == "cursor" and cursor_paging['supported']
+
+    while True:
+        try:
+            if use_cursor:
+                response_json = search_transfers(address, first_block, last_block, api_key,
+                                                 cursor=cursor, paging_style="cursor")
+            else:
+                response_json = search_transfers(address, first_block, last_block, api_key, offset=offset)
+        except requests.HTTPError as e:
+            requests_made += 1
+            rejected = e.response is not None and e.response.status_code in CURSOR_REJECTED_STATUS
+            if not (use_cursor and cursor is None and rejected):
+                raise
+            print(f"Cursor paging is not available ({e.response.status_code}), falling back to offset paging.")
+            cursor_paging['supported'] = False
+            use_cursor = False
+            continue
+        requests_made += 1
+
+        result = response_json.get('result')
+        if not isinstance(result, dict) or 'items' not in result:
+            # Fail the window instead of skipping it, so it is not committed and gets fetched again
+            raise ValueError(f"Unexpected response format for blocks {first_block} to {last_block}: {response_json}")
+
+        items = result['items']
+        if not items:
+            break
+        fetched += len(items)
+        documents += upsert_transfers(collection, enrich(items, api_key, classify_fees, collection.database), address)
+
+        offset += len(items)
+        if use_cursor:
+            cursor = next_cursor(result)
+            if cursor is not None:
+                continue
+            if has_cursor_field(result):
+                break  # Last page
+            # A page without any cursor field means the paging style was ignored, carry on by offset
+            print("Cursor paging returned no cursor, falling back to offset paging.")
+            cursor_paging['supported'] = False
+            use_cursor = False
+        page_size = reported_page_size(result)
+        if page_size and len(items) < page_size:
+            break
+    return requests_made, fetched, documents
+
+
+def next_block_step(block_step, blocks, fetched, min_step=MIN_BLOCK_STEP, max_step=MAX_BLOCK_STEP):
+    # Sizes the next window so its expected transfer count fills one page
+    if fetched == 0:
+        new_step = block_step * 2
+    else:
+        density = fetched / blocks
+        new_step = int(TARGET_PAGE_FILL * PAGE_LIMIT / density)
+        new_step = min(new_step, block_step * MAX_GROWTH)
+    return max(min_step, min(new_step, max_step))
+
+
+def baseline_requests(blocks, fetched, block_step=BASELINE_BLOCK_STEP):
+    # Estimates what a fixed-step scan would have paid for this window, assuming the
+    # transfers are spread evenly; every fixed window costs one request per full page plus one
+    windows = math.ceil(blocks / block_step)
+    per_window = fetched / windows
+    return windows * (int(per_window // PAGE_LIMIT) + 1)
+
+
+def scan_address(collection, address, start_block, end_block, api_key, block_step=200, max_workers=8,
+                 adaptive=True, min_block_step=MIN_BLOCK_STEP, max_block_step=MAX_BLOCK_STEP, paging_style="cursor",
+                 shard=None, classify_fees=False):
+    total_requests = 0
+    total_documents = 0
+    total_baseline = 0
+
+    committed_block = start_block - 1
+    completed = {}  # first block -> last block of finished windows past the committed block
+    load_decimals(collection.database)
+    state = load_state(collection, address, shard)
+    if state:
+        committed_block = max(committed_block, state['committed_block'])
+        completed = {first_block: last_block for first_block, last_block in state.get('done_windows', [])
+                     if first_block > committed_block}
+        print(f"Resuming {address} from block {committed_block + 1}.")
+
+    skipped = sorted(completed.items())
+    next_block = committed_block + 1
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while next_block <= end_block or in_flight:
+            # Keep the pool busy without queueing the whole block range at once
+            while next_block <= end_block and len(in_flight) < max_workers * 2:
+                while skipped and skipped[0][1] < next_block:
+                    skipped.pop(0)
+                if skipped and skipped[0][0] <= next_block:
+                    next_block = skipped.pop(0)[1] + 1
+                    continue
+                last_block = min(next_block + block_step - 1, end_block)
+                if skipped:
+                    last_block = min(last_block, skipped[0][0] - 1)
+                future = executor.submit(fetch_window, collection, address, next_block, last_block, api_key,
+                                         paging_style, classify_fees)
+                in_flight[future] = (next_block, last_block)
+                next_block = last_block + 1
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                first_block, last_block = in_flight.pop(future)
+                requests_made, fetched, documents = future.result()
+                blocks = last_block - first_block + 1
+                total_requests += requests_made
+                total_documents += documents
+                total_baseline += baseline_requests(blocks, fetched)
+                if adaptive:
+                    block_step = next_block_step(block_step, blocks, fetched, min_block_step, max_block_step)
+                print(f"Blocks {first_block} to {last_block} for address {address}: {documents} new documents processed "
+                      f"in {requests_made} requests, next window {block_step} blocks.")
+
+                completed[first_block] = last_block
+                while committed_block + 1 in completed:
+                    committed_block = completed.pop(committed_block + 1)
+                save_progress(collection, address, committed_block, completed, shard)
+
+    return total_requests, total_documents, total_baseline
+
+
+def scan(collection, addresses, start_block, end_block, api_key, block_step=200, max_workers=8, adaptive=True,
+         paging_style="cursor", classify_fees=False):
+    total_requests = 0
+    total_documents = 0
+    total_baseline = 0
+    ensure_transfer_index(collection)
+    for address in addresses:
+        requests_made, documents, baseline = scan_address(collection, address, start_block, end_block, api_key,
+                                                          block_step=block_step, max_workers=max_workers,
+                                                          adaptive=adaptive, paging_style=paging_style,
+                                                          classify_fees=classify_fees)
+        total_requests += requests_made
+        total_documents += documents
+        total_baseline += baseline
+
+    print(f"All data fetched and stored in MongoDB.")
+    print(f"Total new documents stored: {total_documents}")
+    print(f"Total requests made: {total_requests}")
+    print(f"Estimated requests with a fixed {BASELINE_BLOCK_STEP}-block step: {total_baseline} "
+          f"(saved {total_baseline - total_requests})")
+    print_stats()
+    if classify_fees:
+        print_cache_stats()
+    return total_requests
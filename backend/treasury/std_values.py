@@ -0,0 +1,87 @@
+import re
+
+from treasury.dirty_days import mark_dirty_matching
+from treasury.store import TRANSFER_COLLECTIONS
+from treasury import timeseries
+
+# Attributes human-readable values (std_value) to transfer documents.
+# Token decimals come from the 'token_decimals' collection (contract address -> decimals),
+# filled from the balance summaries that register_decimals.py fetches before the scans and
+# 7_treasury_balance.py on every run. Tokens missing from the registry are converted with
+# DEFAULT_DECIMALS, like WETH and AXS; when a token's decimals are registered or change
+# later, the std_value of its stored transfers is recomputed and their days marked dirty.
+
+DEFAULT_DECIMALS = 18
+
+token_decimals = {}  # contract address -> decimals, loaded by load_decimals()
+
+
+def register_decimals(db, items):
+    # Stores the decimals of every token in a balance summary, returns the number of tokens seen
+    previous = {token['_id']: token['decimals'] for token in db['token_decimals'].find({}, {'decimals': 1})}
+    changed = set()
+    n = 0
+    for item in items:
+        if item.get('contractAddress') and item.get('decimals') is not None:
+            n += 1
+            contract = item['contractAddress'].lower()
+            decimals = int(item['decimals'])
+            db['token_decimals'].update_one(
+                {'_id': contract},
+                {'$set': {'tokenSymbol': item.get('tokenSymbol'), 'decimals': decimals}},
+                upsert=True
+            )
+            if previous.get(contract, DEFAULT_DECIMALS) != decimals:
+                changed.add(contract)
+    load_decimals(db)
+    if changed:
+        recompute_std_values(db, changed)
+    return n
+
+
+def load_decimals(db):
+    token_decimals.clear()
+    for token in db['token_decimals'].find({}, {'decimals': 1}):
+        token_decimals[token['_id']] = token['decimals']
+    return token_decimals
+
+
+def decimals_of(item):
+    return token_decimals.get((item.get('contractAddress') or '').lower(), DEFAULT_DECIMALS)
+
+
+def std_value(item):
+    return float(item['value']) / (10 ** decimals_of(item))
+
+
+def std_value_expression(decimals):
+    # Aggregation version of std_value(), choosing the divisor by contract address
+    branches = [
+        {'case': {'$eq': [{'$toLower': '$contractAddress'}, contract]}, 'then': float(10 ** places)}
+        for contract, places in sorted(decimals.items())
+    ]
+    divisor = float(10 ** DEFAULT_DECIMALS)
+    if branches:
+        divisor = {'$switch': {'branches': branches, 'default': divisor}}
+    return {'$divide': [{'$toDouble': '$value'}, divisor]}
+
+
+def set_std_values(collection, query=None, recompute=False):
+    # A single server-side update for every document that has a value but no std_value yet,
+    # or every matching document with recompute=True
+    decimals = load_decimals(collection.database)
+    missing = {**(query or {}), 'value': {'$exists': True}}
+    if not recompute:
+        missing['std_value'] = {'$exists': False}
+    mark_dirty_matching(collection, missing)
+    result = collection.update_many(missing, [{'$set': {'std_value': std_value_expression(decimals)}}])
+    if timeseries.ENABLED:
+        timeseries.timeseries_collection(collection).update_many(
+            missing, [{'$set': {'std_value': std_value_expression(decimals)}}])
+    return result.modified_count
+
+
+def recompute_std_values(db, contracts):
+    # Transfers stored with other decimals for these contracts (lowercase addresses)
+    query = {'contractAddress': {'$in': [re.compile(f'^{contract}$', re.IGNORECASE) for contract in sorted(contracts)]}}
+    return sum(set_std_values(db[name], query, recompute=True) for name in TRANSFER_COLLECTIONS)
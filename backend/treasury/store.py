@@ -0,0 +1,72 @@
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from treasury.dirty_days import mark_dirty
+from treasury.timeseries import mirror_transfers
+
+# Idempotent writes for transfer documents.
+# A transfer is identified by its transaction hash, log index and token id (ERC1155 batches
+# emit several transfers from one log). A unique index on that key plus unordered upserts
+# make re-ingesting a range a no-op instead of a source of duplicated sums.
+# The days of newly stored transfers are marked dirty for the next daily rollup.
+
+TRANSFER_KEY = ['transactionHash', 'logIndex', 'tokenId']
+TRANSFER_COLLECTIONS = ['recent_data', 'new_txn', 'new_treasury', 'old_treasury']
+DUPLICATE_KEY_ERROR = 11000
+
+
+def transfer_key(item):
+    return {field: item.get(field) for field in TRANSFER_KEY}
+
+
+def remove_duplicate_transfers(collection):
+    pipeline = [
+        {"$group": {
+            "_id": {field: f"${field}" for field in TRANSFER_KEY},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    removed = 0
+    for group in collection.aggregate(pipeline, allowDiskUse=True):
+        result = collection.delete_many({'_id': {'$in': group['ids'][1:]}})
+        removed += result.deleted_count
+    return removed
+
+
+def ensure_transfer_index(collection):
+    keys = [(field, ASCENDING) for field in TRANSFER_KEY]
+    try:
+        collection.create_index(keys, unique=True, name='transfer_key')
+    except (DuplicateKeyError, OperationFailure) as e:
+        if e.code != DUPLICATE_KEY_ERROR:
+            raise
+        removed = remove_duplicate_transfers(collection)
+        print(f"Removed {removed} duplicated transfers from '{collection.name}'.")
+        collection.create_index(keys, unique=True, name='transfer_key')
+
+
+def upsert_transfers(collection, items, treasury):
+    # Returns how many of the items were new. treasury is the address the items were scanned for.
+    if not items:
+        return 0
+
+    operations = []
+    for item in items:
+        # Key fields come from the filter on insert, the rest only when the transfer is new
+        document = {k: v for k, v in item.items() if k != '_id' and k not in TRANSFER_KEY}
+        operations.append(UpdateOne(transfer_key(item), {'$setOnInsert': document}, upsert=True))
+
+    try:
+        upserted = collection.bulk_write(operations, ordered=False).upserted_ids
+    except BulkWriteError as e:
+        # Two workers inserting the same transfer at once: the loser just skips it
+        errors = [error for error in e.details['writeErrors'] if error['code'] != DUPLICATE_KEY_ERROR]
+        if errors:
+            raise
+        upserted = {upsert['index']: upsert['_id'] for upsert in e.details['upserted']}
+
+    mark_dirty(collection, (items[index].get('blockTime') for index in upserted))
+    mirror_transfers(collection, [items[index] for index in sorted(upserted)], treasury)
+    return len(upserted)
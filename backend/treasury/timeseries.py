@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, UpdateMany
+from pymongo.errors import CollectionInvalid
+
+# Optional time-series storage for transfers, enabled with TRANSFER_STORAGE=timeseries
+# (MongoDB 7.0+, which allows updates and deletes on any field of a time-series collection).
+# Every transfer collection gets a "<name>_ts" time-series twin. The time field is the block
+# time as a real date, and meta holds the treasury address the transfers were scanned for
+# (passed down by the caller), token and fee type, so MongoDB
+# buckets and compresses transfers per (treasury, token, fee type) and the rollups scan
+# time ranges without converting blockTime per document.
+# The regular collection keeps the unique transfer_key and stays the reference for
+# deduplication: transfers are mirrored once their upsert reports them as new, and fee type,
+# std value and clean-up changes are applied to both.
+
+ENABLED = os.environ.get('TRANSFER_STORAGE', 'collection') == 'timeseries'
+SUFFIX = '_ts'
+TIME_FIELD = 'timestamp'
+META_FIELD = 'meta'
+META_KEYS = ['tokenSymbol', 'feeType']
+
+ready = set()  # Names of the time-series collections already checked by this process
+
+
+def timeseries_collection(collection):
+    return collection.database[collection.name + SUFFIX]
+
+
+def ensure_timeseries(collection):
+    db = collection.database
+    name = collection.name + SUFFIX
+    if name not in db.list_collection_names(filter={'name': name}):
+        try:
+            db.create_collection(name, timeseries={'timeField': TIME_FIELD, 'metaField': META_FIELD,
+                                                   'granularity': 'hours'})
+        except CollectionInvalid:
+            pass  # Created by another process in the meantime
+    ts_collection = db[name]
+    ts_collection.create_index([('meta.treasury', ASCENDING), ('meta.tokenSymbol', ASCENDING),
+                                ('meta.feeType', ASCENDING), (TIME_FIELD, ASCENDING)])
+    ts_collection.create_index([('transactionHash', ASCENDING)])
+    return ts_collection
+
+
+def to_timeseries(item, treasury):
+    document = {k: v for k, v in item.items() if k != '_id' and k not in META_KEYS}
+    document[TIME_FIELD] = datetime.fromtimestamp(item['blockTime'], timezone.utc)
+    document[META_FIELD] = {'treasury': treasury.lower(), **{key: item.get(key) for key in META_KEYS}}
+    return document
+
+
+def mirror_transfers(collection, items, treasury):
+    # Items must be new transfers of the treasury address they were scanned for, a time-series
+    # collection cannot enforce the transfer key
+    if not ENABLED or not items:
+        return 0
+    if collection.name not in ready:
+        ensure_timeseries(collection)
+        ready.add(collection.name)
+    result = timeseries_collection(collection).insert_many([to_timeseries(item, treasury) for item in items],
+                                                           ordered=False)
+    return len(result.inserted_ids)
+
+
+def mirror_fee_types(collection, fee_types):
+    if not ENABLED or not fee_types:
+        return
+    timeseries_collection(collection).bulk_write([
+        UpdateMany({'transactionHash': transaction_hash}, {'$set': {'meta.feeType': fee_type}})
+        for transaction_hash, fee_type in fee_types.items()
+    ], ordered=False)
+
+
+def migrate(collection, treasury, batch_size=10000):
+    # Rebuilds the time-series twin of a transfer collection holding the transfers of a treasury
+    timeseries_collection(collection).drop()
+    ts_collection = ensure_timeseries(collection)
+    copied = 0
+    batch = []
+    for document in collection.find({'blockTime': {'$exists': True}}, batch_size=batch_size):
+        batch.append(to_timeseries(document, treasury))
+        if len(batch) == batch_size:
+            copied += len(ts_collection.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+    if batch:
+        copied += len(ts_collection.insert_many(batch, ordered=False).inserted_ids)
+    return copied
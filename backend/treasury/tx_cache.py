@@ -0,0 +1,37 @@
+import threading
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+# Persistent cache of transaction hash -> full transfer list, in the 'tx_cache' collection.
+# A confirmed transaction's transfers never change, so every hash is fetched from the
+# transfers/txs endpoint once; later runs and rule changes classify from the cache.
+
+stats = {'hits': 0, 'misses': 0}
+stats_lock = threading.Lock()
+
+
+def cached_transactions(db, transaction_hashes):
+    # Transfer lists found in the cache, grouped by hash
+    grouped_data = {doc['_id']: doc['items'] for doc in db['tx_cache'].find({'_id': {'$in': list(transaction_hashes)}})}
+    with stats_lock:
+        stats['hits'] += len(grouped_data)
+        stats['misses'] += len(transaction_hashes) - len(grouped_data)
+    return grouped_data
+
+
+def cache_transactions(db, grouped_data):
+    if not grouped_data:
+        return
+    cached_at = datetime.now(timezone.utc)
+    db['tx_cache'].bulk_write([
+        UpdateOne({'_id': transaction_hash}, {'$setOnInsert': {'items': items, 'cached_at': cached_at}}, upsert=True)
+        for transaction_hash, items in grouped_data.items()
+    ], ordered=False)
+
+
+def print_cache_stats():
+    with stats_lock:
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / lookups * 100 if lookups else 0
+        print(f"Transaction cache: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.1f}% hit rate)")
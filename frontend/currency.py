@@ -1,19 +1,24 @@
+import os
+import sys
 import requests
 from pymongo import MongoClient
 from datetime import datetime, timezone
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from treasury.api_client import get_json
+
 # Script to take the most recent conversion from WETH nad AXS to USD
 
 def get_current_prices():
     url = "https://api.coingecko.com/api/v3/simple/price?ids=axie-infinity,ethereum&vs_currencies=usd"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        axs_price = data['axie-infinity']['usd']
-        weth_price = data['ethereum']['usd']
-        return axs_price, weth_price
-    else:
+    try:
+        data = get_json(url)
+    except requests.RequestException as e:
+        print(f"Price request failed: {e}")
         return None, None
+    axs_price = data['axie-infinity']['usd']
+    weth_price = data['ethereum']['usd']
+    return axs_price, weth_price
 
 def store_prices_in_db(axs_price, weth_price):
     client = MongoClient('mongodb://localhost:27017/')
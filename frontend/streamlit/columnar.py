@@ -0,0 +1,43 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow.feather as feather
+
+# Loads the daily series exported by the backend (see backend/treasury/export.py).
+# The Arrow file (<name>.arrow) is memory-mapped and already typed: timestamp is datetime64
+# and the values are float64 without nulls, so those columns are read-only views of the file
+# and nothing is parsed or copied. The JSON export is only read when no Arrow file was
+# exported yet.
+
+PAGES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+
+def load_json(path):
+    with open(path) as f:
+        data = json.load(f)
+    df = pd.DataFrame(data)
+    if 'timestamp' in df:
+        df['timestamp'] = pd.to_datetime(df['timestamp'].map(
+            lambda t: t['$date'] if isinstance(t, dict) and '$date' in t else t), utc=True).dt.tz_localize(None)
+    return df.drop(columns=['_id'], errors='ignore')
+
+
+def series_path(name, path=PAGES_PATH):
+    # Raises FileNotFoundError when neither <name>.arrow nor <name>.json exists
+    for extension in ('arrow', 'json'):
+        file_path = os.path.join(path, f'{name}.{extension}')
+        if os.path.exists(file_path):
+            return file_path
+    raise FileNotFoundError(os.path.join(path, f'{name}.json'))
+
+
+def load_file(file_path):
+    if file_path.endswith('.arrow'):
+        # One block per column, so the float64 and timestamp columns stay views of the mapped file
+        return feather.read_table(file_path, memory_map=True).to_pandas(split_blocks=True)
+    return load_json(file_path)
+
+
+def load_series(name, path=PAGES_PATH):
+    return load_file(series_path(name, path))
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pandas as pd
+import streamlit as st
+
+from columnar import PAGES_PATH, load_file, series_path
+from ledger import with_running_totals
+
+# Data layer shared by the pages. Streamlit reruns a page on every widget change, so files are
+# read once and kept in the cache, keyed on the file path and its modification time and size:
+# a rerun only filters, and a new export is picked up on the next rerun after it is written.
+# The series are kept in st.cache_resource, which hands every rerun the same DataFrame instead
+# of a pickled copy, so the memory-mapped Arrow columns stay shared. Pages must not modify them
+# in place (assign a new frame instead); the derived columns of a page are built once here.
+
+MAX_ENTRIES = 16  # Old versions of a file are evicted once it was exported a few times
+AXS_FIELDS = ['axs_ascending', 'axs_breeding', 'axs_partsEvol', 'axs_r&cMint', 'axs_atia']
+
+
+def file_version(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_resource(max_entries=MAX_ENTRIES, show_spinner=False)
+def cached_file(file_path, version):
+    return load_file(file_path)
+
+
+def load_series(name, path=PAGES_PATH):
+    # Typed DataFrame of <name>.arrow (or <name>.json), raises FileNotFoundError without either.
+    # Shared between reruns and sessions, read-only.
+    file_path = series_path(name, path)
+    return cached_file(file_path, file_version(file_path))
+
+
+@st.cache_resource(max_entries=MAX_ENTRIES, show_spinner=False)
+def cached_axs_daily(file_path, version):
+    df = cached_file(file_path, version).rename(columns={'timestamp': 'Date'})
+    df['Daily AXS'] = df[AXS_FIELDS].sum(axis=1)
+    return with_running_totals(df, AXS_FIELDS + ['Daily AXS'], 'Date')
+
+
+def load_axs_daily(path=PAGES_PATH):
+    # frontend_data with Date instead of timestamp, the 'Daily AXS' sum of the AXS inflows and
+    # the running totals cum_<field> of those fields. Shared between reruns and sessions, read-only.
+    file_path = series_path('frontend_data', path)
+    return cached_axs_daily(file_path, file_version(file_path))
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, show_spinner=False)
+def cached_balance(file_path, version):
+    with open(file_path) as f:
+        latest = json.load(f)[0]
+    df = pd.DataFrame(latest['items'])
+    df['std_value'] = df['std_value'].astype(float)
+    return df
+
+
+def load_balance(path=PAGES_PATH):
+    # Token rows of the latest balance (see backend/treasury/balances.py)
+    file_path = os.path.join(path, 'balance_latest.json')
+    return cached_balance(file_path, file_version(file_path))
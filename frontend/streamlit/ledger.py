@@ -0,0 +1,32 @@
+import pandas as pd
+
+# Range totals from the running "cum_<field>" totals the backend stores on every daily row
+# (see backend/treasury/ledger.py): a total between two dates is two lookups in the sorted
+# dates instead of a sum over the filtered rows. Running totals missing from older exports,
+# or from some of their rows, are computed here once when the data is loaded.
+
+
+def with_running_totals(df, fields, date_column='timestamp'):
+    # Returns a new frame, 'df' itself is not modified (it may be a shared cached one)
+    if df[date_column].is_monotonic_increasing:
+        df = df.copy(deep=False)  # Exports are already sorted, only new columns are added
+    else:
+        df = df.sort_values(date_column).reset_index(drop=True)
+    for field in fields:
+        cum_field = f'cum_{field}'
+        # Rows without a stored total (older rows, or upserted after the ledger ran) need a full recompute
+        if cum_field not in df or df[cum_field].isna().any():
+            df[cum_field] = df[field].fillna(0).cumsum()
+    return df
+
+
+def total_before(df, field, date, date_column='timestamp'):
+    # Running total at the end of the last day before 'date'
+    position = df[date_column].searchsorted(pd.Timestamp(date), side='left') - 1
+    return df[f'cum_{field}'].iloc[position] if position >= 0 else 0
+
+
+def range_total(df, field, start_date, end_date, date_column='timestamp'):
+    # Sum of a daily field from start_date to end_date, both days included
+    end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    return total_before(df, field, end, date_column) - total_before(df, field, start_date, date_column)
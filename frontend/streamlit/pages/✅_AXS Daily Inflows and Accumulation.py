@@ -1,47 +1,25 @@
 import pandas as pd
 import streamlit as st
 import altair as alt
-import json
-import os
 import datetime
 
-# Define paths for data files
-frontend_data_path = os.path.join(os.path.dirname(__file__), 'frontend_data.json')
-currency_data_path = os.path.join(os.path.dirname(__file__), 'currency.json')
+from data_loader import load_axs_daily, load_series
+from ledger import range_total
 
-# Load data from JSON files
-with open(frontend_data_path) as f:
-    data = json.load(f)
+# Load the daily series with Date, Daily AXS (axs_atia included) and the running totals
+# cum_<field>, and the currency data (cached and shared between reruns, see data_loader.py)
+df = load_axs_daily()
+currency_df = load_series('currency')
 
-with open(currency_data_path) as f:
-    currency_data = json.load(f)
-
-# Ensure correct timestamp format
-for item in data:
-    if isinstance(item['timestamp'], dict) and '$date' in item['timestamp']:
-        item['timestamp'] = item['timestamp']['$date']
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Ensure timestamp is in datetime format
-if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-# Rename 'timestamp' to 'Date'
-df.rename(columns={'timestamp': 'Date'}, inplace=True)
-
-# Sort DataFrame by Date
-df = df.sort_values('Date')
-
-# Compute cumulative and daily values
-df['Ascension'] = df['axs_ascending'].cumsum()
-df['Breeding'] = df['axs_breeding'].cumsum()
-df['Parts Evolution'] = df['axs_partsEvol'].cumsum()
-df['R&C Mint'] = df['axs_r&cMint'].cumsum()
-df['Altar Restore'] = df['axs_atia'].cumsum()  # New field for Atia
-df['Daily AXS'] = df[['axs_ascending', 'axs_breeding', 'axs_partsEvol', 'axs_r&cMint', 'axs_atia']].sum(axis=1)  # Include axs_atia
-df['Cumulative Total AXS'] = df['Daily AXS'].cumsum()
+# Cumulative values, in a new frame so the cached one is left untouched
+df = df.assign(**{
+    'Ascension': df['cum_axs_ascending'],
+    'Breeding': df['cum_axs_breeding'],
+    'Parts Evolution': df['cum_axs_partsEvol'],
+    'R&C Mint': df['cum_axs_r&cMint'],
+    'Altar Restore': df['cum_axs_atia'],  # New field for Atia
+    'Cumulative Total AXS': df['cum_Daily AXS'],
+})
 
 # Reshape data for cumulative chart
 cumulative_df = df[['Date', 'Ascension', 'Breeding', 'Parts Evolution', 'R&C Mint', 'Altar Restore', 'Cumulative Total AXS', 'axs_ascending', 'axs_breeding', 'axs_partsEvol', 'axs_r&cMint', 'axs_atia']].melt(
@@ -92,21 +70,19 @@ rc_mint_df = daily_df[(daily_df['Category'] == 'R&C Mint') & (daily_df['Date'].d
 parts_evol_df = daily_df[(daily_df['Category'] == 'Parts Evolution') & (daily_df['Date'].dt.date >= start_date) & (daily_df['Date'].dt.date <= end_date)]
 ascension_df = daily_df[(daily_df['Category'] == 'Ascension') & (daily_df['Date'].dt.date >= start_date) & (daily_df['Date'].dt.date <= end_date)]
 
-# Calculate accumulated sums for each inflow type using the filter
-accumulated_ascension = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_ascending'].sum()
-accumulated_breeding = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_breeding'].sum()
-accumulated_parts_evol = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_partsEvol'].sum()
-accumulated_rc_mint = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_r&cMint'].sum()
-accumulated_atia = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_atia'].sum()
-accumulated_total_axs = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['Daily AXS'].sum()
+# Calculate accumulated sums for each inflow type from the running totals
+accumulated_ascension = range_total(df, 'axs_ascending', start_date, end_date, 'Date')
+accumulated_breeding = range_total(df, 'axs_breeding', start_date, end_date, 'Date')
+accumulated_parts_evol = range_total(df, 'axs_partsEvol', start_date, end_date, 'Date')
+accumulated_rc_mint = range_total(df, 'axs_r&cMint', start_date, end_date, 'Date')
+accumulated_atia = range_total(df, 'axs_atia', start_date, end_date, 'Date')
+accumulated_total_axs = range_total(df, 'Daily AXS', start_date, end_date, 'Date')
 
 # Function to get the latest AXS price and timestamp from the currency data
 def get_current_axs_price_and_timestamp():
-    latest_currency = currency_data[-1]  # Assuming the last entry is the most recent
+    latest_currency = currency_df.iloc[-1]  # Assuming the last entry is the most recent
     if 'axs_price' in latest_currency and 'timestamp' in latest_currency:
-        axs_price = latest_currency['axs_price']
-        axs_timestamp = pd.to_datetime(latest_currency['timestamp']['$date']) if isinstance(latest_currency['timestamp'], dict) and '$date' in latest_currency['timestamp'] else pd.to_datetime(latest_currency['timestamp'])
-        return axs_price, axs_timestamp
+        return latest_currency['axs_price'], pd.Timestamp(latest_currency['timestamp'])
     else:
         return None, None
 
@@ -188,13 +164,13 @@ tooltip_ascension = [
 filtered_cumulative_df = cumulative_df[(cumulative_df['Date'].dt.date >= start_date) & (cumulative_df['Date'].dt.date <= end_date)]
 filtered_daily_df = daily_df[(daily_df['Date'].dt.date >= start_date) & (daily_df['Date'].dt.date <= end_date)]
 
-# Calculate accumulated sums for each inflow type using the filter
-accumulated_ascension = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_ascending'].sum()
-accumulated_breeding = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_breeding'].sum()
-accumulated_parts_evol = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_partsEvol'].sum()
-accumulated_rc_mint = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_r&cMint'].sum()
-accumulated_atia = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['axs_atia'].sum()
-accumulated_total_axs = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]['Daily AXS'].sum()
+# Calculate accumulated sums for each inflow type from the running totals
+accumulated_ascension = range_total(df, 'axs_ascending', start_date, end_date, 'Date')
+accumulated_breeding = range_total(df, 'axs_breeding', start_date, end_date, 'Date')
+accumulated_parts_evol = range_total(df, 'axs_partsEvol', start_date, end_date, 'Date')
+accumulated_rc_mint = range_total(df, 'axs_r&cMint', start_date, end_date, 'Date')
+accumulated_atia = range_total(df, 'axs_atia', start_date, end_date, 'Date')
+accumulated_total_axs = range_total(df, 'Daily AXS', start_date, end_date, 'Date')
 
 # Chart 1: Daily Sum of AXS Values
 # Calculate the average for Daily AXS values
@@ -2,51 +2,22 @@ import pandas as pd
 from datetime import datetime
 import streamlit as st
 import altair as alt
-import json
-import os
 
-# Define file paths
-frontend_data_path = os.path.join(os.path.dirname(__file__), 'frontend_data.json')
-currency_data_path = os.path.join(os.path.dirname(__file__), 'currency.json')
+from data_loader import load_series
 
-# Load data from JSON files
+# Load the daily series and the currency data (cached typed columns, see data_loader.py)
 try:
-    with open(frontend_data_path) as f:
-        data = json.load(f)
+    df = load_series('frontend_data')
 except FileNotFoundError:
-    st.error(f"File not found: {frontend_data_path}")
+    st.error("File not found: frontend_data")
     st.stop()
 
 try:
-    with open(currency_data_path) as f:
-        currency_data = json.load(f)
+    currency_df = load_series('currency')
 except FileNotFoundError:
-    st.error(f"File not found: {currency_data_path}")
+    st.error("File not found: currency")
     st.stop()
 
-# Ensure correct timestamp format
-for item in data:
-    if isinstance(item['timestamp'], dict) and '$date' in item['timestamp']:
-        item['timestamp'] = item['timestamp']['$date']
-
-# Normalize MongoDB data to DataFrame
-df = pd.DataFrame(data)
-currency_df = pd.json_normalize(currency_data)
-
-# Attempt to find the correct path for timestamp
-timestamp_column = None
-for col in df.columns:
-    if 'timestamp' in col:
-        timestamp_column = col
-        break
-
-# Convert timestamp to datetime
-df['timestamp'] = pd.to_datetime(df[timestamp_column])
-
-# Convert to naive datetime if timezone-aware
-if df['timestamp'].dt.tz:
-    df['timestamp'] = df['timestamp'].dt.tz_convert(None)
-
 # Streamlit app
 st.markdown(f"<h1 style='text-align: center;'>WETH Daily Inflows and Accumulation</h1>", unsafe_allow_html=True)
 
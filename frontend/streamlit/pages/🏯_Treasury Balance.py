@@ -1,51 +1,35 @@
-import json
 import streamlit as st
 import pandas as pd
-import os
-from datetime import datetime
 
-# Path to the JSON files
-treasury_data_path = os.path.join(os.path.dirname(__file__), 'balance.json')
-currency_data_path = os.path.join(os.path.dirname(__file__), 'currency.json')
-frontend_data_path = os.path.join(os.path.dirname(__file__), 'frontend_data.json')
+from data_loader import load_balance, load_series
+from ledger import with_running_totals
 
-# Read the JSON file for treasury data
-with open(treasury_data_path, 'r') as f:
-    treasury_data = json.load(f)
-
-# Read the JSON file for currency data
+# Load the token rows of the latest balance (one small document, see backend/treasury/balances.py)
 try:
-    with open(currency_data_path) as f:
-        currency_data = json.load(f)
+    df = load_balance()
 except FileNotFoundError:
-    st.error(f"File not found: {currency_data_path}")
+    st.error("File not found: balance_latest.json")
     st.stop()
 
-# Convert the currency data to a pandas DataFrame
-currency_df = pd.json_normalize(currency_data)
-
-# Extract the most recent entry from the treasury data
-most_recent_entry = treasury_data[-1]  # Assuming the most recent entry is the last one in the list
-items = most_recent_entry['result']['items']
-
-# Convert data to a pandas DataFrame
-df = pd.DataFrame(items)
+# Load the currency data (cached typed columns, see data_loader.py)
+try:
+    currency_df = load_series('currency')
+except FileNotFoundError:
+    st.error("File not found: currency")
+    st.stop()
 
 # Filter for tokenSymbol "AXS" and "WETH"
 df = df[df['tokenSymbol'].isin(['AXS', 'WETH'])]
 
-# Ensure the std_value values are in numerical format
-df['std_value'] = df['std_value'].astype(float)
-
 # Extract the most recent currency exchange rates
-latest_currency_entry = currency_data[-1]
+latest_currency_entry = currency_df.iloc[-1]
 axs_to_usd_rate = latest_currency_entry['axs_price']
 weth_to_usd_rate = latest_currency_entry['weth_price']
 
 # Extract the latest timestamp from the currency data
 latest_currency_timestamp = latest_currency_entry['timestamp']
 # Convert to human-readable format
-latest_currency_timestamp_human = datetime.fromisoformat(latest_currency_timestamp).strftime('%d %B %Y, %H:%M:%S')
+latest_currency_timestamp_human = pd.Timestamp(latest_currency_timestamp).strftime('%d %B %Y, %H:%M:%S')
 
 # Calculate converted values
 df.loc[df['tokenSymbol'] == 'AXS', 'converted_value'] = df['std_value'] * axs_to_usd_rate
@@ -72,22 +56,16 @@ axs_value = df[df['tokenSymbol'] == 'AXS']['std_value'].values[0]
 axs_converted_value = df[df['tokenSymbol'] == 'AXS']['converted_value'].values[0]
 st.markdown(f"<h3>AXS: {axs_value:,.2f} <span style='font-size: 0.8em;'>(<strong>${axs_converted_value:,.2f}</strong>)</span></h3>", unsafe_allow_html=True)
 
-# Read the JSON file for frontend data
+# Load the daily series
 try:
-    with open(frontend_data_path) as f:
-        frontend_data = json.load(f)
+    frontend_df = load_series('frontend_data')
 except FileNotFoundError:
-    st.error(f"File not found: {frontend_data_path}")
+    st.error("File not found: frontend_data")
     st.stop()
 
-# Convert the frontend data to a pandas DataFrame
-frontend_df = pd.json_normalize(frontend_data)
-
-# Ensure the weth_marketplace values are in numerical format
-frontend_df['weth_marketplace'] = frontend_df['weth_marketplace'].astype(float)
-
-# Calculate the sum of all weth_marketplace values
-total_weth_marketplace = frontend_df['weth_marketplace'].sum()
+# Sum of all weth_marketplace values: the running total on the latest day, or the sum for older exports
+frontend_df = with_running_totals(frontend_df, ['weth_marketplace'])
+total_weth_marketplace = float(frontend_df['cum_weth_marketplace'].iloc[-1])
 missing_weth = weth_value - total_weth_marketplace
 missing_percentage = (1 - total_weth_marketplace / weth_value) * 100
 
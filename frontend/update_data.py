@@ -1,30 +1,19 @@
 import os
-import json
+import sys
 from pymongo import MongoClient
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from treasury.export import export_collections
+
 # MongoDB connection setup
 client = MongoClient('mongodb://localhost:27017/')
 db = client['treasury']
 
 # List of collections to export
-collections = ['frontend_data', 'currency', 'balance']
+collections = ['frontend_data', 'frontend_data_weekly', 'frontend_data_monthly', 'currency', 'balance_latest']
 
 # Base output directory
 output_base_path = 'streamlit/pages'
 
-# Ensure the base directory exists
-os.makedirs(output_base_path, exist_ok=True)
-
-for collection_name in collections:
-    # Fetch all documents from the collection
-    collection = db[collection_name]
-    data = list(collection.find())
-
-    # Specify the path and filename
-    output_path = os.path.join(output_base_path, f'{collection_name}.json')
-
-    # Write the data to a JSON file
-    with open(output_path, 'w') as file:
-        json.dump(data, file, default=str, indent=4)
-
-    print(f'Data exported to {output_path}')
+# Stream every collection to its JSON file, unchanged collections are skipped (see treasury/export.py)
+export_collections(db, collections, output_base_path)